@@ -0,0 +1,158 @@
+"""
+Pipeline produtor/consumidor do ciclo de análise
+Cada estágio roda em sua própria thread, ligado ao seguinte por uma fila
+limitada: quando um estágio atrasa, a fila cheia bloqueia o anterior
+(contrapressão) em vez de acumular itens na memória
+"""
+
+import queue
+import threading
+import time
+
+_DONE = object()
+
+
+class _MeteredQueue(queue.Queue):
+    """Fila limitada que registra profundidade e tempo de bloqueio na inserção
+    
+    Cada fila tem um único produtor (o estágio anterior), então os contadores
+    não precisam de trava.
+    """
+    
+    def __init__(self, maxsize):
+        super().__init__(maxsize)
+        self.puts = 0
+        self.max_depth = 0
+        self.depth_sum = 0
+        self.blocked_seconds = 0.0
+    
+    def put(self, item, block=True, timeout=None):
+        started = time.perf_counter()
+        super().put(item, block, timeout)
+        self.blocked_seconds += time.perf_counter() - started
+        if item is not _DONE:
+            depth = self.qsize()
+            self.puts += 1
+            self.depth_sum += depth
+            self.max_depth = max(self.max_depth, depth)
+    
+    def stats(self):
+        return {
+            'maxsize': self.maxsize,
+            'max_depth': self.max_depth,
+            'mean_depth': round(self.depth_sum / self.puts, 2) if self.puts else 0,
+            'blocked_seconds': round(self.blocked_seconds, 3)
+        }
+
+
+class Stage:
+    """Estágio do pipeline
+    
+    `func(item, emit)` processa um item da fila de entrada e chama `emit`
+    para repassar zero ou mais itens ao próximo estágio; `flush(emit)`,
+    opcional, é chamado no fim do fluxo (por exemplo, para um lote parcial).
+    """
+    
+    def __init__(self, name, func, flush=None):
+        self.name = name
+        self.func = func
+        self.flush = flush
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0
+    
+    def _emit_to(self, output):
+        def emit(item):
+            self.items_out += 1
+            if output is not None:
+                output.put(item)
+        return emit
+    
+    def run(self, source, output):
+        """Consome `source` até o fim do fluxo, repassando os itens a `output`"""
+        emit = self._emit_to(output)
+        try:
+            while True:
+                item = source.get()
+                if item is _DONE:
+                    break
+                self.items_in += 1
+                started = time.perf_counter()
+                try:
+                    self.func(item, emit)
+                except Exception as e:
+                    print(f"⚠️ Erro no estágio {self.name}: {e}")
+                self.busy_seconds += time.perf_counter() - started
+            
+            if self.flush:
+                started = time.perf_counter()
+                try:
+                    self.flush(emit)
+                except Exception as e:
+                    print(f"⚠️ Erro no estágio {self.name}: {e}")
+                self.busy_seconds += time.perf_counter() - started
+        finally:
+            if output is not None:
+                output.put(_DONE)
+
+
+class Pipeline:
+    """Encadeia uma fonte e uma sequência de estágios por filas limitadas"""
+    
+    def __init__(self, stages, queue_size=64):
+        self.stages = list(stages)
+        self.queue_size = queue_size
+        self.stats = {}
+    
+    def run(self, source, source_name='source'):
+        """Executa o pipeline até esgotar `source` e retorna as métricas
+        
+        `source` é um iterável consumido em sua própria thread; a chamada
+        bloqueia até que o último estágio processe o último item.
+        """
+        queues = [_MeteredQueue(self.queue_size) for _ in self.stages]
+        produced = {'items': 0, 'seconds': 0.0}
+        
+        def produce():
+            started = time.perf_counter()
+            try:
+                for item in source:
+                    produced['items'] += 1
+                    queues[0].put(item)
+            except Exception as e:
+                print(f"⚠️ Erro no estágio {source_name}: {e}")
+            finally:
+                produced['seconds'] = time.perf_counter() - started
+                queues[0].put(_DONE)
+        
+        started = time.perf_counter()
+        threads = [threading.Thread(target=produce, name=f"pipeline-{source_name}", daemon=True)]
+        for i, stage in enumerate(self.stages):
+            output = queues[i + 1] if i + 1 < len(queues) else None
+            threads.append(threading.Thread(
+                target=stage.run, args=(queues[i], output),
+                name=f"pipeline-{stage.name}", daemon=True
+            ))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        # A profundidade de cada fila é atribuída ao estágio que a consome
+        self.stats = {
+            'wall_seconds': round(time.perf_counter() - started, 3),
+            'queue_size': self.queue_size,
+            'stages': [{
+                'name': source_name,
+                'items_in': 0,
+                'items_out': produced['items'],
+                'busy_seconds': round(produced['seconds'], 3)
+            }] + [{
+                'name': stage.name,
+                'items_in': stage.items_in,
+                'items_out': stage.items_out,
+                'busy_seconds': round(stage.busy_seconds, 3),
+                'queue': queues[i].stats()
+            } for i, stage in enumerate(self.stages)]
+        }
+        return self.stats
@@ -4,7 +4,7 @@ Executa: python app.py
 Acessa: http://localhost:5000
 """
 
-from flask import Flask, jsonify, render_template_string,send_from_directory
+from flask import Flask, jsonify, render_template_string, request, send_from_directory
 from flask_cors import CORS
 import json
 import os
@@ -12,6 +12,7 @@ from datetime import datetime
 import schedule
 import threading
 from sentiment_analyzer import MarketSentimentAnalyzer
+from sentiment_history import BUCKET_SECONDS, parse_time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -23,7 +24,7 @@ CORS(app)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # pasta raiz do projeto
 FRONTEND_DIR = os.path.join(BASE_DIR, "frontend")
 DATA_FILE = os.path.join(FRONTEND_DIR, "market_sentiment_data.json")
-UPDATE_INTERVAL_MINUTES = 15
+UPDATE_INTERVAL_MINUTES = int(os.getenv('UPDATE_INTERVAL_MINUTES', 15))
 DATA_FILE = 'market_sentiment_data.json'
 analyzer = MarketSentimentAnalyzer()
 analysis_lock = threading.Lock()
@@ -55,13 +56,74 @@ def get_sentiment():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _limit_arg(default, maximum):
+    """?limit= entre 1 e `maximum` (ValueError se não for inteiro)"""
+    return max(1, min(int(request.args.get('limit', default)), maximum))
+
+@app.route('/api/articles', methods=['GET'])
+def get_articles():
+    """Artigos analisados na janela atual (?category=...&asset=...&limit=...)"""
+    try:
+        limit = _limit_arg(50, 500)
+        articles = analyzer.query_articles(
+            category=request.args.get('category'),
+            asset=request.args.get('asset'),
+            limit=limit
+        )
+        return jsonify({'count': len(articles), 'articles': articles})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _history_filters():
+    """Filtros comuns das consultas ao histórico (?asset=&category=&start=&end=)"""
+    asset = request.args.get('asset')
+    return {
+        'asset': analyzer.asset_matcher.canonical(asset) if asset else None,
+        'category': request.args.get('category') or None,
+        'start': parse_time(request.args.get('start')),
+        'end': parse_time(request.args.get('end'))
+    }
+
+@app.route('/api/history/series', methods=['GET'])
+def get_history_series():
+    """Sentimento por hora/dia/semana em um período (?bucket=day)"""
+    if not analyzer.sentiment_history:
+        return jsonify({'error': 'Histórico de sentimento desativado'}), 404
+    try:
+        bucket = request.args.get('bucket', 'day')
+        if bucket not in BUCKET_SECONDS:
+            return jsonify({'error': f"bucket inválido: {bucket}"}), 400
+        series = analyzer.sentiment_history.series(bucket=bucket, **_history_filters())
+        return jsonify({'bucket': bucket, 'series': series})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/history/articles', methods=['GET'])
+def get_history_articles():
+    """Artigos analisados em um período (?limit=100)"""
+    if not analyzer.sentiment_history:
+        return jsonify({'error': 'Histórico de sentimento desativado'}), 404
+    try:
+        limit = _limit_arg(100, 1000)
+        articles = analyzer.sentiment_history.articles(limit=limit, **_history_filters())
+        return jsonify({'count': len(articles), 'articles': articles})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/analyze', methods=['POST'])
 def trigger_analysis():
     """Trigger manual para análise"""
     try:
         print("🚀 Análise manual iniciada...")
-        report = analyzer.generate_report()
-        analyzer.save_report(report, DATA_FILE)
+        with analysis_lock:
+            report = analyzer.generate_report()
+            analyzer.save_report(report, DATA_FILE)
         analyzer.print_summary(report)
         return jsonify({'status': 'success', 'message': 'Análise concluída'}), 200
     except Exception as e:
@@ -77,10 +139,18 @@ def get_status():
             return jsonify({
                 'status': 'ok',
                 'last_update': data.get('timestamp'),
-                'data_file': DATA_FILE
+                'data_file': DATA_FILE,
+                'cache': analyzer.get_cache_stats(),
+                'http': analyzer.get_http_stats(),
+                'quota': analyzer.quota.status(),
+                'history': analyzer.sentiment_history.stats() if analyzer.sentiment_history else None
             })
         else:
-            return jsonify({'status': 'no_data'}), 404
+            return jsonify({
+                'status': 'no_data',
+                'cache': analyzer.get_cache_stats(),
+                'quota': analyzer.quota.status()
+            }), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,228 @@
+"""
+Armazenamento colunar dos artigos analisados
+Uma coluna numpy por campo numérico (sentimento, confiança, datas, categorias),
+fontes internadas e ativos em formato de lista compactada (offsets + ids):
+agregação, ranking e API leem as colunas sem montar um dict por artigo
+"""
+
+import threading
+from datetime import datetime
+import numpy as np
+
+
+class ArticleStore:
+    """Colunas de artigos analisados, na ordem de inserção
+    
+    - categorias e ativos são ids inteiros (categorias como máscara de bits);
+    - nomes de fontes são internados (uma cópia por fonte);
+    - remoções marcam a linha como inativa; as colunas são compactadas
+      quando metade das linhas estiver inativa.
+    """
+    
+    INITIAL_CAPACITY = 1024
+    
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.clear()
+    
+    def clear(self):
+        """Descarta todos os artigos"""
+        with self.lock:
+            self._rows = {}
+            self.size = 0
+            self.removed = 0
+            self.keys = []
+            self.titles = []
+            self.urls = []
+            self.sources = []
+            self._source_ids = {}
+            
+            capacity = self.INITIAL_CAPACITY
+            self.source_id = np.zeros(capacity, dtype=np.int32)
+            self.sentiment = np.zeros(capacity, dtype=np.int8)
+            self.confidence = np.zeros(capacity, dtype=np.float64)
+            self.published = np.zeros(capacity, dtype=np.float64)
+            self.scored_at = np.zeros(capacity, dtype=np.float64)
+            self.category_mask = np.zeros(capacity, dtype=np.uint64)
+            self.alive = np.zeros(capacity, dtype=bool)
+            self.asset_offsets = np.zeros(capacity + 1, dtype=np.int64)
+            self.asset_ids = np.zeros(capacity, dtype=np.int32)
+    
+    def __len__(self):
+        return self.size - self.removed
+    
+    def __contains__(self, key):
+        return key in self._rows
+    
+    def _grow(self, name, needed):
+        column = getattr(self, name)
+        if needed > len(column):
+            grown = np.zeros(max(needed, 2 * len(column)), dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+    
+    def _intern_source(self, source):
+        source_id = self._source_ids.get(source)
+        if source_id is None:
+            source_id = self._source_ids[source] = len(self.sources)
+            self.sources.append(source)
+        return source_id
+    
+    def append(self, key, title, url, source, sentiment, confidence, published,
+               scored_at, category_ids, asset_ids):
+        """Inclui um artigo e retorna a linha (datas em segundos desde a época)"""
+        with self.lock:
+            row = self.size
+            for name in ('source_id', 'sentiment', 'confidence', 'published',
+                         'scored_at', 'category_mask', 'alive'):
+                self._grow(name, row + 1)
+            self._grow('asset_offsets', row + 2)
+            
+            start = self.asset_offsets[row]
+            self._grow('asset_ids', start + len(asset_ids))
+            self.asset_ids[start:start + len(asset_ids)] = asset_ids
+            self.asset_offsets[row + 1] = start + len(asset_ids)
+            
+            self.keys.append(key)
+            self.titles.append(title)
+            self.urls.append(url)
+            self.source_id[row] = self._intern_source(source)
+            self.sentiment[row] = np.sign(sentiment)
+            self.confidence[row] = confidence
+            self.published[row] = published
+            self.scored_at[row] = scored_at
+            self.category_mask[row] = self.mask_of(category_ids)
+            self.alive[row] = True
+            
+            self._rows[key] = row
+            self.size += 1
+            return row
+    
+    @staticmethod
+    def mask_of(category_ids):
+        """Máscara de bits de uma lista de ids de categoria"""
+        mask = 0
+        for category_id in category_ids:
+            mask |= 1 << category_id
+        return np.uint64(mask)
+    
+    def add_categories(self, key, category_ids):
+        """Atribui o artigo a categorias; retorna (linha, máscara só das novas)"""
+        with self.lock:
+            row = self._rows[key]
+            current = int(self.category_mask[row])
+            added = int(self.mask_of(category_ids)) & ~current
+            self.category_mask[row] = np.uint64(current | added)
+            return row, np.uint64(added)
+    
+    def row_of(self, key):
+        """Linha ativa do artigo (ou None)"""
+        return self._rows.get(key)
+    
+    def live_rows(self):
+        """Linhas ativas, na ordem de inserção"""
+        return np.flatnonzero(self.alive[:self.size])
+    
+    def newest_first(self, rows):
+        """Linhas ordenadas da publicação mais recente para a mais antiga"""
+        return rows[np.argsort(-self.published[rows], kind='stable')]
+    
+    def rows_published_before(self, timestamp):
+        """Linhas ativas publicadas antes de `timestamp`"""
+        with self.lock:
+            expired = self.alive[:self.size] & (self.published[:self.size] < timestamp)
+            return np.flatnonzero(expired)
+    
+    def remove_rows(self, rows):
+        """Marca as linhas como inativas (compacta quando metade estiver inativa)"""
+        with self.lock:
+            for row in rows:
+                if self.alive[row]:
+                    self.alive[row] = False
+                    del self._rows[self.keys[row]]
+                    self.removed += 1
+            if self.removed and self.removed * 2 >= self.size:
+                self._compact()
+    
+    def _compact(self):
+        """Reescreve as colunas só com as linhas ativas, preservando a ordem"""
+        rows = self.live_rows()
+        counts = np.diff(self.asset_offsets[:self.size + 1])[rows]
+        starts = self.asset_offsets[rows]
+        assets = (
+            np.concatenate([self.asset_ids[s:s + c] for s, c in zip(starts, counts)])
+            if len(rows) else np.zeros(0, dtype=np.int32)
+        )
+        
+        self.keys = [self.keys[row] for row in rows]
+        self.titles = [self.titles[row] for row in rows]
+        self.urls = [self.urls[row] for row in rows]
+        for name in ('source_id', 'sentiment', 'confidence', 'published',
+                     'scored_at', 'category_mask', 'alive'):
+            column = getattr(self, name)
+            compacted = np.zeros(len(column), dtype=column.dtype)
+            compacted[:len(rows)] = column[rows]
+            setattr(self, name, compacted)
+        self.asset_offsets = np.zeros(len(self.asset_offsets), dtype=np.int64)
+        self.asset_offsets[1:len(rows) + 1] = np.cumsum(counts)
+        self.asset_ids = np.zeros(max(len(assets), self.INITIAL_CAPACITY), dtype=np.int32)
+        self.asset_ids[:len(assets)] = assets
+        
+        self.size = len(rows)
+        self.removed = 0
+        self._rows = {key: row for row, key in enumerate(self.keys)}
+    
+    def category_rows(self, category_id, limit=None):
+        """Linhas ativas da categoria, da mais recente para a mais antiga"""
+        with self.lock:
+            selected = self.alive[:self.size] & (
+                (self.category_mask[:self.size] >> np.uint64(category_id)) & np.uint64(1)
+            ).astype(bool)
+            rows = self.newest_first(np.flatnonzero(selected))
+            return rows[:limit] if limit is not None else rows
+    
+    def asset_rows(self, asset_id, limit=None):
+        """Linhas ativas que mencionam o ativo, da mais recente para a mais antiga"""
+        with self.lock:
+            counts = np.diff(self.asset_offsets[:self.size + 1])
+            end = self.asset_offsets[self.size]
+            owners = np.repeat(np.arange(self.size), counts)
+            rows = np.unique(owners[self.asset_ids[:end] == asset_id])
+            rows = self.newest_first(rows[self.alive[rows]])
+            return rows[:limit] if limit is not None else rows
+    
+    def categories_of(self, row):
+        """Ids das categorias de uma linha"""
+        mask = int(self.category_mask[row])
+        return [category_id for category_id in range(64) if mask >> category_id & 1]
+    
+    def assets_of(self, row):
+        """Ids dos ativos mencionados no título de uma linha"""
+        return self.asset_ids[self.asset_offsets[row]:self.asset_offsets[row + 1]].tolist()
+    
+    def record(self, row):
+        """Registro no formato do relatório (materializado só para exibição)"""
+        return {
+            'title': self.titles[row],
+            'url': self.urls[row],
+            'source': self.sources[self.source_id[row]],
+            'sentiment': int(self.sentiment[row]),
+            'confidence': float(self.confidence[row]),
+            'timestamp': datetime.fromtimestamp(float(self.scored_at[row])).isoformat()
+        }
+    
+    def to_dict(self):
+        """Colunas das linhas ativas em formato serializável"""
+        with self.lock:
+            rows = self.live_rows()
+            return {
+                'keys': [self.keys[row] for row in rows],
+                'titles': [self.titles[row] for row in rows],
+                'urls': [self.urls[row] for row in rows],
+                'sources': [self.sources[self.source_id[row]] for row in rows],
+                'sentiment': self.sentiment[rows].tolist(),
+                'confidence': self.confidence[rows].tolist(),
+                'published': self.published[rows].tolist(),
+                'scored_at': self.scored_at[rows].tolist(),
+                'category_mask': [int(mask) for mask in self.category_mask[rows]]
+            }
@@ -0,0 +1,141 @@
+"""
+Identificação de ativos mencionados em textos
+Autômato Aho-Corasick montado uma única vez a partir das listas de ativos:
+encontra todas as menções em uma só passada por título
+"""
+
+from collections import deque
+
+
+def _is_word_char(char):
+    return char.isalnum()
+
+
+def _lower(char):
+    # Mantém um caractere por posição para que os índices batam com o texto original
+    lowered = char.lower()
+    return lowered if len(lowered) == 1 else char
+
+
+class AssetMatcher:
+    """Busca simultânea de todos os ativos, respeitando limites de palavra
+    
+    - uma menção só conta se não estiver colada a letras ou dígitos
+      ('AI' não casa com "said", 'ETH' não casa com "whether");
+    - só os padrões listados em `tickers` (AAPL, DOT, SOL) diferenciam
+      maiúsculas; os demais nomes não, mesmo escritos em maiúsculas
+      ('NVIDIA' casa com "Nvidia");
+    - menções sobrepostas ficam com a mais longa ("Bitcoin Cash" não conta
+      também como "Bitcoin");
+    - apelidos e tickers são convertidos para o ativo canônico pela tabela
+      `aliases` (AAPL -> Apple, BTC -> Bitcoin).
+    
+    O custo por texto depende do tamanho do texto e do número de menções, não
+    da quantidade de ativos monitorados.
+    """
+    
+    def __init__(self, assets, aliases=None, tickers=None):
+        self.aliases = dict(aliases or {})
+        self.tickers = set(tickers or ())
+        aliases = self.aliases
+        patterns = list(dict.fromkeys(list(assets) + list(aliases)))
+        self.assets = list(dict.fromkeys(aliases.get(pattern, pattern) for pattern in patterns))
+        self.asset_index = {asset: asset_id for asset_id, asset in enumerate(self.assets)}
+        
+        # Cada padrão guarda o texto original, o ativo canônico e se
+        # diferencia maiúsculas
+        self.patterns = [
+            (pattern, self.asset_index[aliases.get(pattern, pattern)], pattern in self.tickers)
+            for pattern in patterns
+        ]
+        
+        # Nó 0 é a raiz; cada nó tem transições, link de falha e saídas
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        
+        for pattern_id, (pattern, _, _) in enumerate(self.patterns):
+            self._insert(''.join(_lower(char) for char in pattern), pattern_id)
+        self._build_links()
+    
+    @classmethod
+    def from_categories(cls, asset_categories, aliases=None, tickers=None):
+        """Monta o autômato com os ativos de todas as categorias"""
+        return cls(
+            (asset for assets in asset_categories.values() for asset in assets),
+            aliases,
+            tickers
+        )
+    
+    def canonical(self, name):
+        """Ativo canônico de um nome ou apelido (ou o próprio nome)"""
+        return self.aliases.get(name, name)
+    
+    def _insert(self, pattern, pattern_id):
+        if not pattern:
+            return
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            node = next_node
+        self._output[node] += (pattern_id,)
+    
+    def _build_links(self):
+        """Links de falha em largura; cada nó herda as saídas do seu link"""
+        pending = deque(self._goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                link = self._goto[fail].get(char, 0)
+                self._fail[child] = link if link != child else 0
+                self._output[child] += self._output[self._fail[child]]
+                pending.append(child)
+    
+    def _spans(self, text):
+        """Menções válidas como (início, fim, ativo), em uma passada pelo texto"""
+        goto, fail, output = self._goto, self._fail, self._output
+        spans = []
+        node = 0
+        for end, char in enumerate(text, 1):
+            char = _lower(char)
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not output[node]:
+                continue
+            if end < len(text) and _is_word_char(text[end]):
+                continue
+            for pattern_id in output[node]:
+                pattern, asset_id, case_sensitive = self.patterns[pattern_id]
+                start = end - len(pattern)
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if case_sensitive and text[start:end] != pattern:
+                    continue
+                spans.append((start, end, asset_id))
+        return spans
+    
+    def find_ids(self, text):
+        """Índices (em self.assets) dos ativos mencionados no texto"""
+        # Mais à esquerda e mais longa primeiro; menções contidas são descartadas
+        found = set()
+        covered = 0
+        for start, end, asset_id in sorted(self._spans(text), key=lambda s: (s[0], -s[1])):
+            if end <= covered:
+                continue
+            found.add(asset_id)
+            covered = max(covered, end)
+        return found
+    
+    def find(self, text):
+        """Ativos canônicos mencionados no texto, na ordem em que foram cadastrados"""
+        return [self.assets[asset_id] for asset_id in sorted(self.find_ids(text))]
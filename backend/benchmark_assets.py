@@ -0,0 +1,97 @@
+"""
+Benchmark da identificação de ativos nos títulos
+Compara o teste ativo x título (expressão regular com limites de palavra)
+com o autômato Aho-Corasick
+à medida que a lista de ativos cresce até milhares de tickers
+Executa: python benchmark_assets.py [--titles 2000] [--sizes 50,500,2000,5000]
+"""
+
+import argparse
+import json
+import random
+import re
+import string
+import time
+from asset_matcher import AssetMatcher
+
+WORDS = [
+    'shares', 'surge', 'after', 'earnings', 'market', 'investors', 'rally',
+    'slides', 'outlook', 'record', 'demand', 'guidance', 'regulators', 'price',
+    'growth', 'crypto', 'gold', 'silver', 'solar', 'energy', 'stocks', 'fund'
+]
+
+
+def synthetic_assets(count, rng):
+    """Tickers e nomes sintéticos, sem repetição"""
+    assets = set()
+    while len(assets) < count:
+        if rng.random() < 0.6:
+            ticker = ''.join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(3, 5)))
+        else:
+            ticker = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(6, 10))).title()
+        assets.add(ticker)
+    return sorted(assets)
+
+
+def synthetic_titles(count, assets, rng):
+    """Manchetes com 8 a 14 palavras, citando de 0 a 2 ativos"""
+    titles = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 14))]
+        for _ in range(rng.randint(0, 2)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(assets))
+        words[0] = words[0].capitalize()
+        titles.append(' '.join(words))
+    return titles
+
+
+def naive_matches(assets, titles):
+    """Cada ativo testado contra cada título (tickers diferenciam maiúsculas)"""
+    patterns = [
+        re.compile(rf"(?<!\w){re.escape(asset)}(?!\w)", 0 if asset.isupper() else re.IGNORECASE)
+        for asset in assets
+    ]
+    return [
+        [asset for asset, pattern in zip(assets, patterns) if pattern.search(title)]
+        for title in titles
+    ]
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    """Mede as duas abordagens para cada tamanho da lista de ativos"""
+    parser = argparse.ArgumentParser(description='Benchmark da identificação de ativos')
+    parser.add_argument('--titles', type=int, default=2000)
+    parser.add_argument('--sizes', default='50,500,2000,5000')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    print("\n⏱️  Resultados:")
+    for size in [int(size) for size in args.sizes.split(',')]:
+        assets = synthetic_assets(size, rng)
+        titles = synthetic_titles(args.titles, assets, rng)
+        
+        tickers = [asset for asset in assets if asset.isupper()]
+        matcher, build_seconds = timed(AssetMatcher, assets, None, tickers)
+        expected, naive_seconds = timed(naive_matches, assets, titles)
+        actual, matcher_seconds = timed(lambda: [matcher.find(title) for title in titles])
+        
+        print(json.dumps({
+            'assets': size,
+            'titles': len(titles),
+            'naive_ms': round(naive_seconds * 1000, 2),
+            'matcher_ms': round(matcher_seconds * 1000, 2),
+            'build_ms': round(build_seconds * 1000, 2),
+            'speedup': round(naive_seconds / max(matcher_seconds, 1e-9), 1),
+            'same_matches': expected == actual
+        }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark dos backends de inferência (PyTorch fp32, PyTorch INT8 e ONNX Runtime)
+Executa: python benchmark_inference.py [--repeat 20] [--batch-size 32]
+"""
+
+import argparse
+import json
+import os
+import time
+from transformers import pipeline
+from inference_backends import (
+    DEFAULT_ONNX_CACHE_DIR, PARITY_CORPUS, OnnxBackend, QuantizedTorchBackend,
+    TorchBackend, check_parity, ort
+)
+
+MODEL_NAME = 'distilbert-base-uncased-finetuned-sst-2-english'
+
+
+def benchmark(backend, batch_ids, batch_size, repeat):
+    """Mede latência por lote e throughput de um backend"""
+    # Aquecimento (alocações, otimização do grafo)
+    backend.predict(batch_ids[:batch_size])
+    
+    latencies = []
+    for _ in range(repeat):
+        for start in range(0, len(batch_ids), batch_size):
+            started = time.perf_counter()
+            backend.predict(batch_ids[start:start + batch_size])
+            latencies.append(time.perf_counter() - started)
+    
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        'backend': backend.name,
+        'batches': len(latencies),
+        'texts_per_sec': round(len(batch_ids) * repeat / total, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 2)
+    }
+
+
+def main():
+    """Compara os backends sobre o corpus de paridade"""
+    parser = argparse.ArgumentParser(description='Benchmark dos backends de inferência')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+    
+    print("🤖 Carregando modelo de sentimento (DistilBERT)...")
+    sentiment_pipeline = pipeline("sentiment-analysis", model=MODEL_NAME, device=-1)
+    tokenizer = sentiment_pipeline.tokenizer
+    
+    torch_backend = TorchBackend(sentiment_pipeline.model, tokenizer)
+    backends = [torch_backend, QuantizedTorchBackend(sentiment_pipeline.model, tokenizer)]
+    if ort is not None:
+        backends.append(OnnxBackend(
+            sentiment_pipeline.model, tokenizer, MODEL_NAME,
+            cache_dir=os.getenv('ONNX_CACHE_DIR', DEFAULT_ONNX_CACHE_DIR)
+        ))
+    else:
+        print("⚠️ onnxruntime não instalado; backend ONNX fora do benchmark")
+    
+    for backend in backends[1:]:
+        print(f"\n🔎 Paridade {backend.name} x torch:")
+        print(json.dumps(check_parity(torch_backend, backend, tokenizer), indent=2))
+    
+    batch_ids = tokenizer(PARITY_CORPUS, truncation=True, max_length=512)['input_ids']
+    print("\n⏱️  Resultados:")
+    for backend in backends:
+        print(json.dumps(benchmark(backend, batch_ids, args.batch_size, args.repeat)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark de ponta a ponta do pipeline (busca, análise e agregação)
+Grava as respostas uma vez e reproduz offline de forma determinística:
+    NEWS_FIXTURE_MODE=record python sentiment_analyzer.py
+    python benchmark_pipeline.py [--runs 5] [--latency-ms 150] [--jitter-ms 50] [--warm]
+A gravação busca todas as consultas planejadas, sem o orçamento por ciclo;
+o limite diário (NEWS_API_DAILY_LIMIT) ainda precisa comportar
+consultas x NEWS_API_MAX_PAGES requisições. Consultas sem fixture encerram o
+benchmark com erro.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# O benchmark sempre reproduz fixtures e não lê nem grava estado ou histórico em disco
+os.environ['NEWS_FIXTURE_MODE'] = 'replay'
+os.environ['ANALYSIS_STATE_FILE'] = ''
+os.environ['SENTIMENT_DB_PATH'] = ''
+os.environ['SENTIMENT_HISTORY_PATH'] = ''
+# Fixtures antigas continuam dentro da janela de análise
+os.environ.setdefault('ANALYSIS_WINDOW_HOURS', str(10 * 365 * 24))
+
+from sentiment_analyzer import MarketSentimentAnalyzer
+
+
+def reset(analyzer):
+    """Volta o analisador ao estado de um início a frio"""
+    analyzer.reset_state()
+    analyzer.sentiment_cache.clear()
+    analyzer.token_cache.clear()
+    analyzer.news_source.rewind()
+
+
+def main():
+    """Executa generate_report repetidas vezes sobre as fixtures gravadas"""
+    parser = argparse.ArgumentParser(description='Benchmark do pipeline completo')
+    parser.add_argument('--fixtures', default=None, help='Diretório das fixtures gravadas')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--warm', action='store_true',
+                        help='Mantém caches e janela entre execuções (ciclos consecutivos)')
+    args = parser.parse_args()
+    
+    if args.fixtures:
+        os.environ['NEWS_FIXTURE_DIR'] = args.fixtures
+    os.environ['NEWS_FIXTURE_LATENCY_MS'] = str(args.latency_ms)
+    os.environ['NEWS_FIXTURE_JITTER_MS'] = str(args.jitter_ms)
+    
+    analyzer = MarketSentimentAnalyzer()
+    
+    runs = []
+    for run in range(1, args.runs + 1):
+        if not args.warm:
+            reset(analyzer)
+        
+        started = time.perf_counter()
+        report = analyzer.generate_report()
+        elapsed = time.perf_counter() - started
+        
+        performance = report['performance']
+        articles = performance['index'].get('unique_articles', 0)
+        runs.append({
+            'run': run,
+            'seconds': round(elapsed, 3),
+            'articles': articles,
+            'articles_per_sec': round(articles / elapsed, 1) if elapsed > 0 else 0,
+            'fetch_seconds': performance['fetch']['wall_seconds'],
+            'inference_texts': performance['inference']['texts'],
+            'tokens_per_sec': performance['inference']['tokens_per_sec'],
+            'padding_ratio': performance['inference']['padding_ratio']
+        })
+    
+    seconds = [r['seconds'] for r in runs]
+    summary = {
+        'runs': len(runs),
+        'mode': 'warm' if args.warm else 'cold',
+        'latency_ms': args.latency_ms,
+        'jitter_ms': args.jitter_ms,
+        'seconds_mean': round(statistics.mean(seconds), 3),
+        'seconds_stdev': round(statistics.stdev(seconds), 3) if len(seconds) > 1 else 0,
+        'seconds_min': min(seconds),
+        'fixture_misses': analyzer.news_source.misses
+    }
+    
+    print("\n⏱️  Execuções:")
+    for r in runs:
+        print(json.dumps(r))
+    print("\n📊 Resumo:")
+    print(json.dumps(summary, indent=2))
+    
+    # Sem fixture para alguma consulta, a carga medida é parcial
+    if summary['fixture_misses']:
+        print(
+            f"\n❌ {summary['fixture_misses']} consultas sem fixture gravada: "
+            f"grave novamente com NEWS_FIXTURE_MODE=record"
+        )
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
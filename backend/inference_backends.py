@@ -0,0 +1,193 @@
+"""
+Backends de inferência do modelo de sentimento
+PyTorch (padrão) e ONNX Runtime (opcional, para hosts só com CPU)
+"""
+
+import os
+import numpy as np
+import torch
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+DEFAULT_ONNX_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'onnx_models'
+)
+
+# Corpus fixo de manchetes usado para checar a paridade entre backends
+PARITY_CORPUS = [
+    "Apple shares jump after record iPhone sales beat expectations",
+    "Microsoft cloud revenue slows, stock slides in after-hours trading",
+    "NVIDIA unveils new AI chips as demand for data centers soars",
+    "Tesla recalls thousands of vehicles over faulty software",
+    "Intel cuts jobs amid shrinking PC market and heavy losses",
+    "Bitcoin rallies past key resistance as ETF inflows accelerate",
+    "Ethereum network upgrade completed without major issues",
+    "Crypto exchange collapses, leaving customers unable to withdraw funds",
+    "Regulators sue major crypto firm over unregistered securities",
+    "Dogecoin surges after celebrity endorsement on social media",
+    "Gold price hits all-time high as investors seek safe haven",
+    "Gold slips as stronger dollar weighs on precious metals",
+    "Silver demand from solar panel makers reaches record levels",
+    "Silver market faces supply shortage, prices volatile",
+    "Renewable energy stocks tumble after subsidy cuts announced",
+    "NextEra reports strong quarterly earnings, raises guidance",
+    "Solar installations grow at fastest pace in a decade",
+    "Wind farm project cancelled due to rising costs",
+    "Amazon faces antitrust lawsuit from federal regulators",
+    "Google parent Alphabet announces massive share buyback",
+    "Markets mixed as investors await central bank decision",
+    "Meta stock plunges after disappointing revenue forecast",
+    "AMD gains market share from rivals in server processors",
+    "Litecoin transaction volume declines for third straight month",
+]
+
+
+def _pad(tokenizer, batch_ids, return_tensors):
+    """Aplica padding a um lote de input_ids já tokenizados"""
+    return tokenizer.pad(
+        {'input_ids': [list(ids) for ids in batch_ids]},
+        return_tensors=return_tensors
+    )
+
+
+def _softmax(logits):
+    """Softmax numericamente estável sobre o último eixo"""
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class TorchBackend:
+    """Inferência com o modelo PyTorch do pipeline transformers"""
+    
+    name = 'torch'
+    
+    def __init__(self, model, tokenizer):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.id2label = model.config.id2label
+    
+    def predict_proba(self, batch_ids):
+        """Probabilidades por classe (array numpy) para um lote de input_ids"""
+        inputs = _pad(self.tokenizer, batch_ids, 'pt')
+        with torch.no_grad():
+            logits = self.model(**inputs).logits
+        return torch.softmax(logits, dim=-1).numpy()
+    
+    def predict(self, batch_ids):
+        """Rótulo e score da classe mais provável de cada item do lote"""
+        probs = self.predict_proba(batch_ids)
+        return [
+            {'label': self.id2label[int(label_id)], 'score': float(row[label_id])}
+            for row, label_id in zip(probs, probs.argmax(axis=-1))
+        ]
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """Inferência PyTorch com as camadas lineares quantizadas dinamicamente (INT8)
+    
+    Os pesos das camadas nn.Linear são convertidos para int8 e as ativações
+    são quantizadas em tempo de execução; reduz memória e tempo em CPU.
+    """
+    
+    name = 'torch-int8'
+    
+    def __init__(self, model, tokenizer):
+        model.eval()
+        quantized = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        super().__init__(quantized, tokenizer)
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Adaptador que expõe apenas os logits do modelo para exportação ONNX"""
+    
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+    
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+
+class OnnxBackend(TorchBackend):
+    """Inferência com ONNX Runtime sobre o grafo exportado do modelo
+    
+    O grafo é exportado uma única vez para `cache_dir` e reutilizado nos
+    próximos inícios do servidor.
+    """
+    
+    name = 'onnx'
+    
+    def __init__(self, model, tokenizer, model_name, cache_dir=DEFAULT_ONNX_CACHE_DIR,
+                 num_threads=0):
+        if ort is None:
+            raise RuntimeError("onnxruntime não está instalado")
+        
+        super().__init__(model, tokenizer)
+        self.path = os.path.join(cache_dir, model_name.replace('/', '__'), 'model.onnx')
+        if not os.path.exists(self.path):
+            self._export()
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            self.path, options, providers=['CPUExecutionProvider']
+        )
+    
+    def _export(self):
+        """Exporta o modelo para ONNX com eixos dinâmicos de lote e sequência"""
+        print(f"📦 Exportando modelo para ONNX: {self.path}")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        
+        sample = self.tokenizer(["export sample"], return_tensors='pt')
+        tmp_path = f"{self.path}.tmp"
+        self.model.eval()
+        with torch.no_grad():
+            torch.onnx.export(
+                _LogitsOnly(self.model),
+                (sample['input_ids'], sample['attention_mask']),
+                tmp_path,
+                input_names=['input_ids', 'attention_mask'],
+                output_names=['logits'],
+                dynamic_axes={
+                    'input_ids': {0: 'batch', 1: 'sequence'},
+                    'attention_mask': {0: 'batch', 1: 'sequence'},
+                    'logits': {0: 'batch'}
+                },
+                opset_version=14
+            )
+        # Renomear só ao final evita deixar um grafo incompleto no cache
+        os.replace(tmp_path, self.path)
+    
+    def predict_proba(self, batch_ids):
+        """Probabilidades por classe (array numpy) para um lote de input_ids"""
+        inputs = _pad(self.tokenizer, batch_ids, 'np')
+        (logits,) = self.session.run(['logits'], {
+            'input_ids': inputs['input_ids'].astype(np.int64),
+            'attention_mask': inputs['attention_mask'].astype(np.int64)
+        })
+        return _softmax(logits)
+
+
+def check_parity(reference, candidate, tokenizer, texts=PARITY_CORPUS, max_length=512):
+    """Compara dois backends sobre um corpus fixo
+    
+    Retorna a concordância de rótulos (0 a 1) e a maior diferença absoluta
+    entre as probabilidades por classe.
+    """
+    batch_ids = tokenizer(texts, truncation=True, max_length=max_length)['input_ids']
+    expected = reference.predict_proba(batch_ids)
+    actual = candidate.predict_proba(batch_ids)
+    
+    return {
+        'samples': len(texts),
+        'label_agreement': round(float(
+            (expected.argmax(axis=-1) == actual.argmax(axis=-1)).mean()
+        ), 4),
+        'max_prob_diff': float(np.abs(expected - actual).max())
+    }
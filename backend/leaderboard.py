@@ -0,0 +1,158 @@
+"""
+Rankings de ativos mantidos de forma incremental
+Cada menção nova (ou removida da janela) reposiciona o ativo em heaps
+indexados; os top-k são lidos sem ordenar a lista inteira de ativos
+"""
+
+import heapq
+
+
+class IndexedHeap:
+    """Heap mínimo indexado por chave
+    
+    A prioridade de uma chave pode ser alterada ou removida em O(log n); os k
+    menores são lidos sem modificar o heap em O(k log k).
+    """
+    
+    def __init__(self):
+        self._heap = []
+        self._pos = {}
+    
+    def __len__(self):
+        return len(self._heap)
+    
+    def __contains__(self, key):
+        return key in self._pos
+    
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._pos[heap[i][1]] = i
+        self._pos[heap[j][1]] = j
+    
+    def _sift_up(self, i):
+        while i:
+            parent = (i - 1) // 2
+            if self._heap[i] >= self._heap[parent]:
+                break
+            self._swap(i, parent)
+            i = parent
+    
+    def _sift_down(self, i):
+        size = len(self._heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < size and self._heap[child] < self._heap[smallest]:
+                    smallest = child
+            if smallest == i:
+                return
+            self._swap(i, smallest)
+            i = smallest
+    
+    def update(self, key, priority):
+        """Insere a chave ou altera sua prioridade"""
+        pos = self._pos.get(key)
+        if pos is None:
+            self._heap.append((priority, key))
+            self._pos[key] = len(self._heap) - 1
+            self._sift_up(len(self._heap) - 1)
+            return
+        old = self._heap[pos][0]
+        self._heap[pos] = (priority, key)
+        if priority < old:
+            self._sift_up(pos)
+        else:
+            self._sift_down(pos)
+    
+    def remove(self, key):
+        """Remove a chave (se presente)"""
+        pos = self._pos.pop(key, None)
+        if pos is None:
+            return
+        last = self._heap.pop()
+        if pos < len(self._heap):
+            self._heap[pos] = last
+            self._pos[last[1]] = pos
+            self._sift_up(pos)
+            self._sift_down(self._pos[last[1]])
+    
+    def smallest(self, k):
+        """As k chaves de menor prioridade, em ordem, sem alterar o heap"""
+        result = []
+        candidates = [(self._heap[0], 0)] if self._heap else []
+        while candidates and len(result) < k:
+            (_, key), i = heapq.heappop(candidates)
+            result.append(key)
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(self._heap):
+                    heapq.heappush(candidates, (self._heap[child], child))
+        return result
+
+
+class AssetLeaderboard:
+    """Estatísticas por ativo e os quatro rankings do relatório
+    
+    - most_talked / least_talked: por número de menções;
+    - most_positive / most_negative: por sentimento médio.
+    
+    Empates seguem a ordem dos ativos (id), como na ordenação estável.
+    """
+    
+    def __init__(self, assets):
+        self.assets = list(assets)
+        size = len(self.assets)
+        self.mentions = [0] * size
+        self.positive = [0] * size
+        self.negative = [0] * size
+        self.sentiment_score = [0] * size
+        self.rankings = {
+            'most_talked': IndexedHeap(),
+            'least_talked': IndexedHeap(),
+            'most_positive': IndexedHeap(),
+            'most_negative': IndexedHeap()
+        }
+    
+    def sentiment_avg(self, asset_id):
+        mentions = self.mentions[asset_id]
+        return round(self.sentiment_score[asset_id] / mentions, 3) if mentions else 0
+    
+    def add(self, asset_ids, sentiment, sign=1):
+        """Soma (sign=1) ou subtrai (sign=-1) as menções de um artigo"""
+        for asset_id in asset_ids:
+            self.mentions[asset_id] += sign
+            if sentiment > 0:
+                self.positive[asset_id] += sign
+            elif sentiment < 0:
+                self.negative[asset_id] += sign
+            self.sentiment_score[asset_id] += sign * sentiment
+            self._reposition(asset_id)
+    
+    def _reposition(self, asset_id):
+        """Atualiza a posição do ativo nos rankings em O(log n)"""
+        mentions = self.mentions[asset_id]
+        if mentions <= 0:
+            for ranking in self.rankings.values():
+                ranking.remove(asset_id)
+            return
+        avg = self.sentiment_avg(asset_id)
+        self.rankings['most_talked'].update(asset_id, (-mentions, asset_id))
+        self.rankings['least_talked'].update(asset_id, (mentions, asset_id))
+        self.rankings['most_positive'].update(asset_id, (-avg, asset_id))
+        self.rankings['most_negative'].update(asset_id, (avg, asset_id))
+    
+    def entry(self, asset_id):
+        return {
+            'asset': self.assets[asset_id],
+            'mentions': self.mentions[asset_id],
+            'positive': self.positive[asset_id],
+            'negative': self.negative[asset_id],
+            'sentiment_avg': self.sentiment_avg(asset_id)
+        }
+    
+    def top(self, k=10):
+        """Os k primeiros de cada ranking"""
+        return {
+            name: [self.entry(asset_id) for asset_id in ranking.smallest(k)]
+            for name, ranking in self.rankings.items()
+        }
@@ -0,0 +1,222 @@
+"""
+Servidor local que imita o endpoint /v2/everything da NEWS API
+Para testes de carga e soak do estágio de busca, sem acesso à rede
+Executa: python mock_newsapi_server.py --port 5055 --latency-ms 120 --error-rate 0.01
+Aponta o analisador: NEWS_API_URL=http://localhost:5055/v2/everything
+As datas de publicação avançam com o relógio (um artigo novo por consulta a
+cada --article-interval-minutes), para que os ciclos de um soak recebam
+artigos novos; --frozen-clock mantém sempre o mesmo conjunto
+"""
+
+import argparse
+import hashlib
+import math
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from flask import Flask, jsonify, request
+from quota_scheduler import TokenBucket
+
+app = Flask(__name__)
+
+POSITIVE_PHRASES = [
+    'shares surge after strong earnings', 'rallies to record high',
+    'beats expectations with robust growth', 'gains as investors cheer outlook',
+    'announces major expansion plan'
+]
+NEGATIVE_PHRASES = [
+    'shares tumble on weak guidance', 'slides amid regulatory probe',
+    'misses estimates as demand falls', 'drops after disappointing results',
+    'faces lawsuit over data breach'
+]
+SOURCES = ['Reuters', 'Bloomberg', 'CNBC', 'Financial Times', 'MarketWatch', 'CoinDesk']
+
+# Configuração padrão (substituída pelos argumentos de linha de comando)
+config = {
+    'total_results': 300,
+    'results_jitter': 0.5,
+    'max_page_size': 100,
+    'latency_ms': 100.0,
+    'latency_dist': 'lognormal',
+    'error_rate': 0.0,
+    'throttle_rate': 0.0,
+    'rate_limit_per_sec': 0.0,
+    'article_interval_minutes': 5.0,
+    'frozen_clock': False
+}
+stats = {'requests': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0, 'articles': 0}
+stats_lock = threading.Lock()
+rate_limiter = None
+started_at = datetime.now(timezone.utc)
+
+
+def _count(key, amount=1):
+    with stats_lock:
+        stats[key] += amount
+
+
+def _latency_seconds(rng):
+    """Sorteia a latência da resposta conforme a distribuição configurada"""
+    mean = config['latency_ms'] / 1000
+    dist = config['latency_dist']
+    if mean <= 0:
+        return 0
+    if dist == 'fixed':
+        return mean
+    if dist == 'uniform':
+        return rng.uniform(0, 2 * mean)
+    if dist == 'exponential':
+        return rng.expovariate(1 / mean)
+    # lognormal com média `mean` e cauda longa (sigma 0.6)
+    sigma = 0.6
+    return rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+
+
+def _query_terms(query):
+    terms = [term.strip().strip('"') for term in query.split(' OR ')]
+    return [term for term in terms if term] or ['market']
+
+
+def _slot_seconds():
+    return config['article_interval_minutes'] * 60
+
+
+def _newest_slot():
+    """Intervalo de publicação mais recente (avança com o relógio, salvo --frozen-clock)"""
+    now = started_at if config['frozen_clock'] else datetime.now(timezone.utc)
+    return math.floor(now.timestamp() / _slot_seconds())
+
+
+def _article(query, terms, slot):
+    """Artigo sintético determinístico (mesma consulta e intervalo -> mesmo artigo)"""
+    seed = int(hashlib.sha1(f"{query}|{slot}".encode('utf-8')).hexdigest()[:12], 16)
+    rng = random.Random(seed)
+    term = terms[slot % len(terms)]
+    phrase = rng.choice(POSITIVE_PHRASES if rng.random() < 0.5 else NEGATIVE_PHRASES)
+    published = datetime.fromtimestamp(slot * _slot_seconds(), timezone.utc)
+    return {
+        'source': {'id': None, 'name': rng.choice(SOURCES)},
+        'author': None,
+        'title': f"{term} {phrase}",
+        'description': f"Analysts discuss how {term} {phrase} and what it means for markets.",
+        'url': f"https://mock-news.local/{seed:x}",
+        'urlToImage': None,
+        'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'content': None
+    }
+
+
+def _total_results(query):
+    """Quantidade de resultados da consulta (varia de forma determinística)"""
+    rng = random.Random(query)
+    jitter = config['results_jitter']
+    scale = 1 + rng.uniform(-jitter, jitter)
+    return max(int(config['total_results'] * scale), 0)
+
+
+def _error(status, code, message):
+    return jsonify({'status': 'error', 'code': code, 'message': message}), status
+
+
+@app.route('/v2/everything', methods=['GET'])
+def everything():
+    """Imita /v2/everything: paginação, filtro por data, latência e falhas"""
+    _count('requests')
+    rng = random.Random()
+    
+    if rate_limiter and not rate_limiter.acquire(timeout=0):
+        _count('rate_limited')
+        return _error(429, 'rateLimited', 'You have made too many requests recently.')
+    if rng.random() < config['throttle_rate']:
+        _count('rate_limited')
+        return _error(429, 'rateLimited', 'You have made too many requests recently.')
+    
+    time.sleep(_latency_seconds(rng))
+    
+    if rng.random() < config['error_rate']:
+        _count('errors')
+        return _error(500, 'unexpectedError', 'This shouldn\'t happen, and if it does then it\'s our fault, not yours.')
+    
+    query = request.args.get('q', '')
+    if not query:
+        _count('errors')
+        return _error(400, 'parametersMissing', 'Required parameters are missing: q.')
+    
+    page_size = min(int(request.args.get('pageSize', 100)), config['max_page_size'])
+    page = max(int(request.args.get('page', 1)), 1)
+    
+    # Artigos ordenados do mais recente ao mais antigo, um por intervalo;
+    # 'from' corta a lista
+    newest = _newest_slot()
+    total = _total_results(query)
+    from_param = request.args.get('from')
+    if from_param:
+        try:
+            since = datetime.fromisoformat(from_param.replace('Z', '+00:00'))
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            oldest = math.ceil(since.timestamp() / _slot_seconds())
+            total = min(total, max(newest - oldest + 1, 0))
+        except ValueError:
+            return _error(400, 'parameterInvalid', f"Invalid 'from' parameter: {from_param}")
+    
+    terms = _query_terms(query)
+    start = (page - 1) * page_size
+    articles = [
+        _article(query, terms, newest - i) for i in range(start, min(start + page_size, total))
+    ]
+    
+    _count('ok')
+    _count('articles', len(articles))
+    return jsonify({'status': 'ok', 'totalResults': total, 'articles': articles})
+
+
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    """Contadores de requisições atendidas, erros e respostas 429"""
+    with stats_lock:
+        return jsonify(dict(stats, config=config))
+
+
+def main():
+    """Inicia o servidor com os parâmetros de carga informados"""
+    global rate_limiter
+    
+    parser = argparse.ArgumentParser(description='Servidor local que imita a NEWS API')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--total-results', type=int, default=config['total_results'],
+                        help='Resultados médios por consulta')
+    parser.add_argument('--results-jitter', type=float, default=config['results_jitter'],
+                        help='Variação relativa do total de resultados entre consultas')
+    parser.add_argument('--max-page-size', type=int, default=config['max_page_size'])
+    parser.add_argument('--latency-ms', type=float, default=config['latency_ms'],
+                        help='Latência média das respostas')
+    parser.add_argument('--latency-dist', default=config['latency_dist'],
+                        choices=['fixed', 'uniform', 'exponential', 'lognormal'])
+    parser.add_argument('--error-rate', type=float, default=config['error_rate'],
+                        help='Fração de respostas 500')
+    parser.add_argument('--throttle-rate', type=float, default=config['throttle_rate'],
+                        help='Fração de respostas 429 aleatórias')
+    parser.add_argument('--rate-limit-per-sec', type=float, default=config['rate_limit_per_sec'],
+                        help='Limite de requisições por segundo (excedentes recebem 429)')
+    parser.add_argument('--article-interval-minutes', type=float,
+                        default=config['article_interval_minutes'],
+                        help='Intervalo entre as datas de publicação sintéticas')
+    parser.add_argument('--frozen-clock', action='store_true',
+                        help='Datas fixas no início do servidor (sem artigos novos entre ciclos)')
+    args = parser.parse_args()
+    
+    config.update({
+        key: value for key, value in vars(args).items() if key in config
+    })
+    if args.rate_limit_per_sec > 0:
+        rate_limiter = TokenBucket(args.rate_limit_per_sec)
+    
+    print(f"🧪 NEWS API local em http://localhost:{args.port}/v2/everything")
+    print(f"   Configuração: {config}")
+    app.run(port=args.port, threaded=True, debug=False, use_reloader=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,500 @@
+"""
+Fontes de notícias
+Interface comum para NEWS API, diretórios locais de JSONL e arquivos RSS/Atom;
+todas produzem um iterador de artigos normalizados no formato da NEWS API.
+Inclui gravação/reprodução de respostas (fixtures) para benchmarks offline.
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+import requests
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+
+DEFAULT_FIXTURE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'news'
+)
+
+
+def to_published_at(value):
+    """Converte datas ISO 8601 ou RFC 822 (RSS) para o formato publishedAt da API"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def normalize_article(raw, source_name=None):
+    """Artigo no formato da NEWS API (title, description, url, publishedAt, source)"""
+    source = raw.get('source')
+    if not isinstance(source, dict):
+        source = {'name': source or source_name or 'Unknown'}
+    return {
+        'title': raw.get('title') or '',
+        'description': raw.get('description') or '',
+        'url': raw.get('url') or '',
+        'publishedAt': to_published_at(raw.get('publishedAt')),
+        'source': {'name': source.get('name') or source_name or 'Unknown'}
+    }
+
+
+def query_pattern(query):
+    """Expressão regular para uma consulta simples ou combinada com OR
+    
+    Os termos (sem aspas) são buscados como palavras inteiras, sem diferenciar
+    maiúsculas, aproximando a busca por palavras da NEWS API.
+    """
+    terms = [
+        term.strip().strip('"')
+        for term in query.split(' OR ')
+        if term.strip().strip('"')
+    ]
+    alternatives = '|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+    return re.compile(rf'(?<!\w)(?:{alternatives})(?!\w)', re.IGNORECASE)
+
+
+def matches_query(article, pattern):
+    """Indica se a consulta aparece no título ou na descrição do artigo"""
+    return bool(pattern.search(f"{article['title']} {article['description']}"))
+
+
+def _min_published_at(days, since):
+    """publishedAt mínimo aceito: `since` ou o início da janela de `days` dias"""
+    if since:
+        return to_published_at(since)
+    start = datetime.now(timezone.utc) - timedelta(days=days)
+    return start.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class NewsSource:
+    """Interface das fontes de notícias"""
+    
+    name = 'base'
+    # Fontes com cota de requisições passam pelo agendador de cota
+    metered = False
+    
+    def iter_articles(self, query, days=1, since=None):
+        """Itera os artigos normalizados que atendem à consulta"""
+        raise NotImplementedError
+    
+    def iter_pages(self, query, days=1, since=None, status=None):
+        """Itera os artigos em páginas (listas), à medida que ficam disponíveis
+        
+        Fontes paginadas repassam cada página assim que ela chega; as demais
+        entregam todos os resultados em uma única página. `status` opcional
+        (dict) recebe 'complete': True só quando todos os resultados da
+        consulta foram entregues.
+        """
+        articles = list(self.iter_articles(query, days=days, since=since))
+        if articles:
+            yield articles
+        if status is not None:
+            status['complete'] = True
+    
+    def fetch(self, query, days=1, since=None):
+        """Lista materializada de iter_articles"""
+        return list(self.iter_articles(query, days=days, since=since))
+
+
+class NewsAPISource(NewsSource):
+    """Endpoint /v2/everything da NEWS API"""
+    
+    name = 'newsapi'
+    metered = True
+    
+    def __init__(self, api_key, base_url, session, quota=None, timeout=10,
+                 page_size=100, max_pages=1, budgeted=True):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.session = session
+        self.quota = quota
+        self.timeout = timeout
+        self.page_size = page_size
+        self.max_pages = max_pages
+        # False: só o limite diário e o por segundo valem (gravação de fixtures)
+        self.budgeted = budgeted
+        self.http_stats = {
+            'requests': 0, 'gzip_responses': 0, 'payload_bytes': 0, 'decoded_bytes': 0
+        }
+        self._stats_lock = threading.Lock()
+    
+    def _params(self, query, days, since, page=1):
+        """Parâmetros da consulta; com `since`, do mais recente ao mais antigo"""
+        from_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        to_date = datetime.now().strftime('%Y-%m-%d')
+        
+        params = {
+            'q': query,
+            'from': since or from_date,
+            'to': to_date,
+            'sortBy': 'publishedAt' if since else 'relevancy',
+            'pageSize': self.page_size,
+            'page': page,
+            'apiKey': self.api_key,
+            'language': 'en'
+        }
+        if since:
+            # 'to' por data cortaria o dia corrente no meio; sem ele vai até agora
+            del params['to']
+        return params
+    
+    def iter_pages(self, query, days=1, since=None, status=None):
+        """Itera as páginas da NEWS API, até `max_pages` ou o fim dos resultados
+        
+        Cada página é repassada assim que chega; erros de rede (inclusive o
+        limite de resultados do plano) encerram a iteração. A busca só é
+        marcada como completa em `status` quando chega ao fim dos resultados
+        (`totalResults`), não quando para no limite de páginas ou na cota.
+        """
+        if status is not None:
+            status['complete'] = False
+        for page in range(1, self.max_pages + 1):
+            # Respeitar o limite por segundo e o orçamento diário da API
+            if self.quota and not self.quota.acquire(budgeted=self.budgeted):
+                print(f"⛔ Orçamento da NEWS API esgotado; busca de {query} interrompida")
+                return
+            
+            try:
+                response = self.session.get(
+                    self.base_url,
+                    params=self._params(query, days, since, page),
+                    timeout=self.timeout
+                )
+                # Bytes trafegados (comprimidos, pelo Content-Length; sem ele,
+                # o tamanho do corpo) e bytes do corpo depois de descomprimido
+                decoded = len(response.content)
+                transferred = int(response.headers.get('Content-Length') or decoded)
+                with self._stats_lock:
+                    self.http_stats['requests'] += 1
+                    if response.headers.get('Content-Encoding') == 'gzip':
+                        self.http_stats['gzip_responses'] += 1
+                    self.http_stats['payload_bytes'] += transferred
+                    self.http_stats['decoded_bytes'] += decoded
+                response.raise_for_status()
+                data = response.json()
+            except requests.exceptions.RequestException as e:
+                print(f"❌ Erro ao buscar notícias: {e}")
+                return
+            
+            articles = data.get('articles', [])
+            if articles:
+                yield [normalize_article(article) for article in articles]
+            if len(articles) < self.page_size or page * self.page_size >= data.get('totalResults', 0):
+                if status is not None:
+                    status['complete'] = True
+                return
+    
+    def iter_articles(self, query, days=1, since=None):
+        """Itera os artigos da NEWS API, página a página"""
+        for page in self.iter_pages(query, days=days, since=since):
+            yield from page
+
+
+class _LocalSource(NewsSource):
+    """Base das fontes em arquivos locais: carrega e recarrega quando mudam"""
+    
+    patterns = ()
+    
+    def __init__(self, directory):
+        self.directory = directory
+        self._articles = []
+        self._signature = None
+        self._lock = threading.Lock()
+    
+    def _files(self):
+        files = []
+        for pattern in self.patterns:
+            files.extend(glob.glob(os.path.join(self.directory, '**', pattern), recursive=True))
+        return sorted(files)
+    
+    def _load_file(self, path):
+        raise NotImplementedError
+    
+    def _articles_snapshot(self):
+        """Artigos de todos os arquivos (relidos só se algum arquivo mudou)"""
+        files = self._files()
+        signature = tuple((path, os.path.getmtime(path)) for path in files)
+        with self._lock:
+            if signature != self._signature:
+                articles = []
+                for path in files:
+                    try:
+                        articles.extend(self._load_file(path))
+                    except Exception as e:
+                        print(f"⚠️ Erro ao ler {path}: {e}")
+                self._articles = articles
+                self._signature = signature
+            return self._articles
+    
+    def iter_articles(self, query, days=1, since=None):
+        """Itera os artigos locais que atendem à consulta e ao período"""
+        pattern = query_pattern(query)
+        min_published = _min_published_at(days, since)
+        for article in self._articles_snapshot():
+            if article['publishedAt'] and article['publishedAt'] < min_published:
+                continue
+            if matches_query(article, pattern):
+                yield article
+
+
+class JSONLDirectorySource(_LocalSource):
+    """Diretório de arquivos .jsonl (ou .jsonl.gz) com um artigo por linha"""
+    
+    name = 'jsonl'
+    patterns = ('*.jsonl', '*.jsonl.gz')
+    
+    def _load_file(self, path):
+        opener = gzip.open if path.endswith('.gz') else open
+        articles = []
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    articles.append(normalize_article(json.loads(line)))
+        return articles
+
+
+class RSSDirectorySource(_LocalSource):
+    """Diretório de arquivos RSS 2.0 / Atom salvos localmente"""
+    
+    name = 'rss'
+    patterns = ('*.xml', '*.rss', '*.atom')
+    
+    def _load_file(self, path):
+        root = ET.parse(path).getroot()
+        
+        # RSS 2.0: <channel><item>
+        channel = root.find('channel')
+        if channel is not None:
+            feed_name = channel.findtext('title')
+            return [
+                normalize_article({
+                    'title': item.findtext('title'),
+                    'description': item.findtext('description'),
+                    'url': item.findtext('link'),
+                    'publishedAt': item.findtext('pubDate'),
+                    'source': item.findtext('source')
+                }, source_name=feed_name)
+                for item in channel.iter('item')
+            ]
+        
+        # Atom: <feed><entry>
+        feed_name = root.findtext(f'{ATOM_NS}title')
+        articles = []
+        for entry in root.iter(f'{ATOM_NS}entry'):
+            link = entry.find(f'{ATOM_NS}link')
+            articles.append(normalize_article({
+                'title': entry.findtext(f'{ATOM_NS}title'),
+                'description': entry.findtext(f'{ATOM_NS}summary'),
+                'url': link.get('href') if link is not None else None,
+                'publishedAt': (
+                    entry.findtext(f'{ATOM_NS}published') or entry.findtext(f'{ATOM_NS}updated')
+                )
+            }, source_name=feed_name))
+        return articles
+
+
+class MultiSource(NewsSource):
+    """Combina várias fontes, consultadas em paralelo
+    
+    Os artigos são repassados à medida que cada fonte os produz; a
+    deduplicação entre fontes fica a cargo do índice global de artigos.
+    """
+    
+    name = 'multi'
+    
+    def __init__(self, sources):
+        self.sources = list(sources)
+        self.metered = any(source.metered for source in self.sources)
+    
+    def iter_pages(self, query, days=1, since=None, status=None):
+        if len(self.sources) == 1:
+            yield from self.sources[0].iter_pages(query, days=days, since=since, status=status)
+            return
+        
+        results = queue.Queue(maxsize=16)
+        done = object()
+        statuses = [{} for _ in self.sources]
+        
+        def produce(source, source_status):
+            try:
+                for page in source.iter_pages(query, days=days, since=since, status=source_status):
+                    results.put(page)
+            except Exception as e:
+                print(f"⚠️ Erro na fonte {source.name}: {e}")
+            finally:
+                results.put(done)
+        
+        for source, source_status in zip(self.sources, statuses):
+            threading.Thread(target=produce, args=(source, source_status), daemon=True).start()
+        
+        pending = len(self.sources)
+        while pending:
+            item = results.get()
+            if item is done:
+                pending -= 1
+            else:
+                yield item
+        if status is not None:
+            status['complete'] = all(s.get('complete') for s in statuses)
+    
+    def iter_articles(self, query, days=1, since=None):
+        for page in self.iter_pages(query, days=days, since=since):
+            yield from page
+
+
+def _fixture_path(directory, query):
+    """Arquivo de fixture de uma consulta (nome derivado do hash da consulta)"""
+    digest = hashlib.sha1(query.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(directory, f"{digest}.json.gz")
+
+
+class RecordingSource(NewsSource):
+    """Repassa outra fonte e grava cada resposta em fixtures comprimidas
+    
+    Cada consulta tem um arquivo .json.gz com a lista de respostas na ordem
+    em que ocorreram, para que a reprodução siga os mesmos ciclos. A gravação
+    é uma captura única: todas as consultas planejadas são buscadas, sem a
+    seleção pelo orçamento do ciclo (não é marcada como `metered`).
+    """
+    
+    name = 'record'
+    
+    def __init__(self, source, directory):
+        self.source = source
+        self.directory = directory
+        self.metered = False
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+    
+    def iter_pages(self, query, days=1, since=None, status=None):
+        articles = []
+        for page in self.source.iter_pages(query, days=days, since=since, status=status):
+            articles.extend(page)
+            yield page
+        self._record(query, days, since, articles)
+    
+    def iter_articles(self, query, days=1, since=None):
+        for page in self.iter_pages(query, days=days, since=since):
+            yield from page
+    
+    def _record(self, query, days, since, articles):
+        path = _fixture_path(self.directory, query)
+        with self._lock:
+            fixture = {'query': query, 'responses': []}
+            if os.path.exists(path):
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    fixture = json.load(f)
+            fixture['responses'].append({
+                'days': days,
+                'since': since,
+                'recorded_at': datetime.now(timezone.utc).isoformat(),
+                'articles': articles
+            })
+            tmp_path = f"{path}.tmp"
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                json.dump(fixture, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+
+class ReplaySource(NewsSource):
+    """Reproduz fixtures gravadas pela RecordingSource, sem acesso à rede
+    
+    As respostas de cada consulta são servidas na ordem gravada (a última se
+    repete quando acabam). Uma latência simulada (média e variação uniforme,
+    em ms) pode ser aplicada antes de cada resposta.
+    """
+    
+    name = 'replay'
+    
+    def __init__(self, directory, latency_ms=0, jitter_ms=0, seed=None):
+        self.directory = directory
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(seed)
+        self._cursors = {}
+        self._fixtures = {}
+        self._lock = threading.Lock()
+        self.misses = 0
+    
+    def _load(self, query):
+        if query not in self._fixtures:
+            path = _fixture_path(self.directory, query)
+            if os.path.exists(path):
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    self._fixtures[query] = json.load(f)['responses']
+            else:
+                self._fixtures[query] = []
+        return self._fixtures[query]
+    
+    def iter_articles(self, query, days=1, since=None):
+        with self._lock:
+            responses = self._load(query)
+            cursor = self._cursors.get(query, 0)
+            self._cursors[query] = cursor + 1
+            delay = max(
+                self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms), 0
+            ) / 1000
+        
+        if delay:
+            time.sleep(delay)
+        if not responses:
+            self.misses += 1
+            print(f"⚠️ Sem fixture gravada para: {query}")
+            return
+        yield from responses[min(cursor, len(responses) - 1)]['articles']
+    
+    def rewind(self):
+        """Volta todas as consultas para a primeira resposta gravada"""
+        with self._lock:
+            self._cursors.clear()
+
+
+def build_news_source(spec, newsapi_source, fixture_mode=None, fixture_dir=None,
+                      latency_ms=0, jitter_ms=0):
+    """Monta a fonte de notícias a partir de NEWS_SOURCES
+    
+    Formato: entradas separadas por vírgula, por exemplo
+    "newsapi", "jsonl:/dados/noticias" ou "newsapi,rss:/dados/feeds".
+    Com `fixture_mode` "record", as respostas são gravadas em `fixture_dir`;
+    com "replay", as fixtures substituem as fontes configuradas.
+    """
+    if fixture_mode == 'replay':
+        return ReplaySource(fixture_dir, latency_ms=latency_ms, jitter_ms=jitter_ms)
+    
+    sources = []
+    for entry in (spec or 'newsapi').split(','):
+        kind, _, location = entry.strip().partition(':')
+        if kind == 'newsapi':
+            sources.append(newsapi_source)
+        elif kind == 'jsonl':
+            sources.append(JSONLDirectorySource(location))
+        elif kind == 'rss':
+            sources.append(RSSDirectorySource(location))
+        elif kind:
+            raise ValueError(f"Fonte de notícias desconhecida: {kind}")
+    
+    source = MultiSource(sources)
+    if fixture_mode == 'record':
+        return RecordingSource(source, fixture_dir)
+    return source
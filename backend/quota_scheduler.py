@@ -0,0 +1,222 @@
+"""
+Controle de cota da NEWS API
+Token bucket para o limite por segundo e orçamento que acumula à taxa do
+limite diário, gasto a cada requisição (página) da NEWS API
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+DAY_SECONDS = 24 * 3600
+
+
+class TokenBucket:
+    """Limitador de taxa: `rate` fichas por segundo, acumulando até `capacity`"""
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def acquire(self, timeout=None):
+        """Aguarda uma ficha; retorna False se `timeout` (s) expirar antes"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class QuotaScheduler:
+    """Distribui as requisições à NEWS API ao longo do dia
+    
+    - limita a taxa por segundo (token bucket);
+    - conta as chamadas das últimas 24 horas contra o limite diário;
+    - o orçamento cresce continuamente a `daily_limit` requisições por dia e
+      cada página buscada gasta uma requisição inteira; a fração que sobra
+      passa para o ciclo seguinte (com 100/dia e ciclos de 15 minutos, cerca
+      de 1,04 requisição por ciclo em média). O acúmulo é limitado a um ciclo
+      mais uma requisição, para não gastar de uma vez o que sobrou de um
+      período parado;
+    - em cada ciclo escolhe primeiro as consultas com maior velocidade
+      recente de artigos (ponderada pelo tempo sem atualização, para que
+      nenhuma consulta fique sem ser buscada indefinidamente).
+    """
+    
+    # Peso das observações novas na média móvel da velocidade
+    VELOCITY_ALPHA = 0.3
+    
+    def __init__(self, daily_limit=100, rate_per_sec=5, cycle_minutes=15):
+        self.daily_limit = daily_limit
+        self.cycle_seconds = cycle_minutes * 60
+        self.bucket = TokenBucket(rate_per_sec)
+        self._calls = deque()
+        self._lock = threading.Lock()
+        self.budget_capacity = self.cycle_share() + 1
+        self._budget = self.budget_capacity
+        self._budget_updated = time.time()
+        self.velocity = {}
+        self.last_fetched = {}
+        self.skipped = 0
+    
+    def _prune(self, now):
+        while self._calls and self._calls[0] <= now - DAY_SECONDS:
+            self._calls.popleft()
+    
+    def _accrue(self, now):
+        """Soma ao orçamento a fração do limite diário desde a última atualização"""
+        elapsed = max(now - self._budget_updated, 0)
+        self._budget = min(
+            self.budget_capacity, self._budget + self.daily_limit * elapsed / DAY_SECONDS
+        )
+        self._budget_updated = now
+    
+    def cycle_share(self):
+        """Fração do limite diário correspondente a um intervalo entre ciclos"""
+        return self.daily_limit * self.cycle_seconds / DAY_SECONDS
+    
+    def remaining(self):
+        """Requisições ainda disponíveis na janela de 24 horas"""
+        with self._lock:
+            self._prune(time.time())
+            return max(self.daily_limit - len(self._calls), 0)
+    
+    def cycle_allowance(self):
+        """Requisições inteiras disponíveis agora no orçamento acumulado"""
+        with self._lock:
+            now = time.time()
+            self._prune(now)
+            self._accrue(now)
+            return min(max(self.daily_limit - len(self._calls), 0), math.floor(self._budget))
+    
+    def priority(self, query, now=None):
+        """Prioridade de uma consulta: velocidade de artigos x horas sem busca"""
+        now = now or time.time()
+        last = self.last_fetched.get(query)
+        if last is None:
+            return math.inf  # Nunca buscada: vai primeiro
+        hours_idle = max(now - last, 0) / 3600
+        return (self.velocity.get(query, 0) + 0.1) * hours_idle
+    
+    def select(self, queries):
+        """Escolhe as consultas do ciclo dentro do orçamento, por prioridade
+        
+        Cada consulta escolhida custa ao menos uma requisição; páginas
+        adicionais são cobradas em acquire() e podem esgotar o orçamento.
+        """
+        allowance = self.cycle_allowance()
+        now = time.time()
+        ranked = sorted(queries, key=lambda q: self.priority(q, now), reverse=True)
+        selected = ranked[:allowance]
+        self.skipped += len(queries) - len(selected)
+        return selected
+    
+    def acquire(self, budgeted=True):
+        """Reserva uma requisição (taxa por segundo, orçamento e limite diário)
+        
+        Com `budgeted=False` (captura única, como a gravação de fixtures), só
+        o limite diário e o por segundo são aplicados.
+        """
+        with self._lock:
+            now = time.time()
+            self._prune(now)
+            self._accrue(now)
+            if len(self._calls) >= self.daily_limit:
+                return False
+            if budgeted:
+                if self._budget < 1:
+                    return False
+                self._budget -= 1
+            self._calls.append(now)
+        self.bucket.acquire()
+        return True
+    
+    def record_results(self, query, article_count):
+        """Atualiza a velocidade (artigos/hora) observada para uma consulta"""
+        now = time.time()
+        last = self.last_fetched.get(query)
+        self.last_fetched[query] = now
+        if last is None:
+            return
+        observed = article_count / max((now - last) / 3600, 1 / 60)
+        previous = self.velocity.get(query, observed)
+        self.velocity[query] = (
+            self.VELOCITY_ALPHA * observed + (1 - self.VELOCITY_ALPHA) * previous
+        )
+    
+    def status(self):
+        """Orçamento restante e projeção de esgotamento no ritmo da última hora"""
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            used = len(self._calls)
+            last_hour = sum(1 for t in self._calls if t > now - 3600)
+        remaining = max(self.daily_limit - used, 0)
+        
+        # As chamadas saem da janela de 24h, em média, a used/24 por hora:
+        # só há esgotamento se o ritmo da última hora for maior que isso
+        exhaustion = None
+        net_per_hour = last_hour - used / 24
+        if remaining == 0:
+            exhaustion = datetime.now().isoformat()
+        elif net_per_hour > 0:
+            hours_left = remaining / net_per_hour
+            if hours_left < 24:
+                exhaustion = (datetime.now() + timedelta(hours=hours_left)).isoformat()
+        
+        return {
+            'daily_limit': self.daily_limit,
+            'used_24h': used,
+            'remaining': remaining,
+            'calls_last_hour': last_hour,
+            'cycle_share': round(self.cycle_share(), 3),
+            'cycle_allowance': self.cycle_allowance(),
+            'budget': round(self._budget, 3),
+            'skipped_queries': self.skipped,
+            'projected_exhaustion': exhaustion
+        }
+    
+    def to_dict(self):
+        """Estado serializável (chamadas das últimas 24h, orçamento e velocidades)"""
+        with self._lock:
+            now = time.time()
+            self._prune(now)
+            self._accrue(now)
+            calls = list(self._calls)
+            budget = self._budget
+        return {
+            'calls': calls,
+            'budget': budget,
+            'budget_updated': now,
+            'velocity': self.velocity,
+            'last_fetched': self.last_fetched
+        }
+    
+    def load(self, state):
+        """Restaura o estado salvo por to_dict()"""
+        with self._lock:
+            self._calls = deque(sorted(state.get('calls', [])))
+            if 'budget' in state:
+                self._budget = min(state['budget'], self.budget_capacity)
+                self._budget_updated = state.get('budget_updated', time.time())
+            now = time.time()
+            self._prune(now)
+            self._accrue(now)
+        self.velocity = dict(state.get('velocity', {}))
+        self.last_fetched = dict(state.get('last_fetched', {}))
@@ -4,14 +4,30 @@ Análise de sentimento de mercado em tempo real com NEWS API e Transformers
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import numpy as np
 import os
-from datetime import datetime, timedelta
-from collections import defaultdict
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from analysis_pipeline import Pipeline, Stage
+from article_store import ArticleStore
+from asset_matcher import AssetMatcher
+from leaderboard import AssetLeaderboard
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from dotenv import load_dotenv
-import pandas as pd
 from transformers import pipeline
 import warnings
+from inference_backends import (
+    DEFAULT_ONNX_CACHE_DIR, OnnxBackend, QuantizedTorchBackend, TorchBackend, check_parity
+)
+from news_fetcher import DEFAULT_FIXTURE_DIR, NewsAPISource, build_news_source
+from quota_scheduler import QuotaScheduler
+from sentiment_cache import DEFAULT_DB_PATH, LRUCache, SentimentStore, content_hash
+from sentiment_history import DEFAULT_HISTORY_PATH, SentimentHistory
 
 # Suprimir avisos
 warnings.filterwarnings('ignore')
@@ -19,12 +35,59 @@ warnings.filterwarnings('ignore')
 # Carregar variáveis de ambiente
 load_dotenv()
 
+def _utc_iso(timestamp):
+    """Converte um timestamp ISO 8601 (com 'Z' ou sem fuso) para ISO em UTC comparável"""
+    try:
+        parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return ''
+    if parsed.tzinfo is None:
+        parsed = parsed.astimezone()
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+def _epoch(timestamp):
+    """Segundos desde a época de um timestamp ISO 8601 (0 se inválido)"""
+    iso = _utc_iso(timestamp)
+    return datetime.fromisoformat(iso).timestamp() if iso else 0.0
+
+
+DEFAULT_STATE_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'analysis_state.json'
+)
+
+# Parâmetros de rastreamento ignorados na comparação de URLs
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'cmpid', 'ocid')
+
+
+def normalize_url(url):
+    """Normaliza uma URL para identificar o mesmo artigo vindo de buscas diferentes
+    
+    Ignora maiúsculas no esquema/host, fragmento, barra final e parâmetros
+    de rastreamento; os demais parâmetros são ordenados.
+    """
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path.rstrip('/') or '/',
+        urlencode(query),
+        ''
+    ))
+
+
 class MarketSentimentAnalyzer:
     """Analisador de sentimento do mercado"""
     
     def __init__(self):
         self.api_key = os.getenv('NEWS_API_KEY')
-        self.base_url = 'https://newsapi.org/v2/everything'
+        self.base_url = os.getenv('NEWS_API_URL', 'https://newsapi.org/v2/everything')
         
         # Categorias de ativos
         self.asset_categories = {
@@ -61,13 +124,111 @@ class MarketSentimentAnalyzer:
             ]
         }
         
+        # Tickers e sinônimos -> ativo canônico (as menções somam no ativo real)
+        self.asset_aliases = {
+            'AAPL': 'Apple', 'MSFT': 'Microsoft', 'GOOGL': 'Google',
+            'AMZN': 'Amazon', 'TSLA': 'Tesla',
+            'AI': 'artificial intelligence', 'tech': 'technology',
+            'BTC': 'Bitcoin', 'ETH': 'Ethereum', 'ADA': 'Cardano',
+            'SOL': 'Solana', 'DOT': 'Polkadot', 'XRP': 'Ripple',
+            'DOGE': 'Dogecoin', 'LTC': 'Litecoin', 'XMR': 'Monero',
+            'crypto': 'cryptocurrency',
+            'ouro': 'gold', 'aurum': 'gold', 'ouro spot': 'gold', 'onça de ouro': 'gold',
+            'troy ounce gold': 'gold', 'commodity oro': 'gold', 'mercado de ouro': 'gold',
+            'preço do ouro': 'gold', 'gold price': 'gold', 'gold market': 'gold',
+            'investimento ouro': 'gold', 'EFT ouro': 'gold',
+            'prata': 'silver', 'argentum': 'silver', 'prata spot': 'silver',
+            'prata bullion': 'silver', 'onça de prata': 'silver', 'troy ounce silver': 'silver',
+            'commodity plata': 'silver', 'mercado de prata': 'silver', 'preço da prata': 'silver',
+            'silver price': 'silver', 'silver market': 'silver', 'investimento prata': 'silver'
+        }
+        
+        # Tickers e siglas que diferenciam maiúsculas ('SOL' não casa com "sol",
+        # 'DOT' com "dot"); os demais nomes casam sem diferenciar
+        self.asset_tickers = {
+            'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'AI',
+            'BTC', 'ETH', 'ADA', 'SOL', 'DOT', 'XRP', 'DOGE', 'LTC', 'XMR',
+            'GLD', 'GOLDBEES', 'SLV', 'SILVERBEES'
+        }
+        
+        self.category_ids = {category: i for i, category in enumerate(self.asset_categories)}
+        
+        # Autômato de busca dos ativos nos títulos, montado uma única vez
+        self.asset_matcher = AssetMatcher.from_categories(
+            self.asset_categories, self.asset_aliases, self.asset_tickers
+        )
+        
         # Pipeline de análise de sentimento
+        self.model_name = 'distilbert-base-uncased-finetuned-sst-2-english'
         self.sentiment_pipeline = None
+        self.backend_name = os.getenv('SENTIMENT_BACKEND', 'torch').lower()
+        self.inference_backend = None
+        self.quantize = os.getenv('SENTIMENT_QUANTIZE', '').lower()
+        self.model_variant = None
+        self.batch_size = int(os.getenv('SENTIMENT_BATCH_SIZE', 32))
+        self.token_budget = int(os.getenv('SENTIMENT_TOKEN_BUDGET', 4096))
+        self.token_cache = LRUCache(int(os.getenv('TOKEN_CACHE_SIZE', 20000)))
+        self.sentiment_cache = LRUCache(int(os.getenv('SENTIMENT_CACHE_SIZE', 50000)))
+        self.sentiment_store = None
+        self._initialize_sentiment_store()
+        self.sentiment_history = None
+        self.history_stats = {}
+        self._initialize_sentiment_history()
+        self._reset_inference_stats()
         self._initialize_sentiment_model()
         
-        # Armazenamento de dados
-        self.market_data = defaultdict(lambda: defaultdict(list))
-        self.articles_by_asset = defaultdict(list)
+        # Busca de notícias em paralelo
+        self.fetch_workers = int(os.getenv('FETCH_WORKERS', 8))
+        self.max_pages = int(os.getenv('NEWS_API_MAX_PAGES', 1))
+        # As threads de busca e /api/status acessam as métricas ao mesmo tempo
+        self._fetch_stats_lock = threading.Lock()
+        self._reset_fetch_stats()
+        self.index_stats = {}
+        
+        # Pipeline busca -> deduplicação -> análise -> agregação
+        self.pipeline_queue_size = int(os.getenv('PIPELINE_QUEUE_SIZE', 64))
+        self.pipeline_stats = {}
+        
+        # Busca incremental: marcas d'água por palavra-chave e janela de artigos
+        self.window_hours = float(os.getenv('ANALYSIS_WINDOW_HOURS', 24))
+        self.state_file = os.getenv('ANALYSIS_STATE_FILE', DEFAULT_STATE_FILE)
+        self._pending_watermarks = {}
+        self.incremental_stats = {}
+        
+        # Cota da NEWS API (limite diário e por segundo)
+        self.quota = QuotaScheduler(
+            daily_limit=int(os.getenv('NEWS_API_DAILY_LIMIT', 100)),
+            rate_per_sec=float(os.getenv('NEWS_API_RATE_PER_SEC', 5)),
+            cycle_minutes=int(os.getenv('UPDATE_INTERVAL_MINUTES', 15))
+        )
+        self._load_state()
+        
+        # Empacotamento de palavras-chave em consultas OR (limite de 500 caracteres da API)
+        self.query_packing = os.getenv('QUERY_PACKING', '1') == '1'
+        self.query_max_length = int(os.getenv('QUERY_MAX_LENGTH', 500))
+        
+        # Sessão HTTP com pool de conexões keep-alive (reutilizadas entre requisições)
+        self.http_pool_size = int(os.getenv('HTTP_POOL_SIZE', self.fetch_workers))
+        self.http_adapter = None
+        self.session = self._create_http_session()
+        
+        # Gravação/reprodução de respostas (NEWS_FIXTURE_MODE=record|replay);
+        # a gravação é uma captura única e não segue o orçamento por ciclo
+        fixture_mode = os.getenv('NEWS_FIXTURE_MODE') or None
+        
+        # Fontes de notícias (NEWS_SOURCES, ex.: "newsapi,jsonl:/dados/noticias")
+        self.newsapi = NewsAPISource(
+            self.api_key, self.base_url, self.session, self.quota, max_pages=self.max_pages,
+            budgeted=fixture_mode != 'record'
+        )
+        self.news_source = build_news_source(
+            os.getenv('NEWS_SOURCES', 'newsapi'),
+            self.newsapi,
+            fixture_mode=fixture_mode,
+            fixture_dir=os.getenv('NEWS_FIXTURE_DIR', DEFAULT_FIXTURE_DIR),
+            latency_ms=float(os.getenv('NEWS_FIXTURE_LATENCY_MS', 0)),
+            jitter_ms=float(os.getenv('NEWS_FIXTURE_JITTER_MS', 0))
+        )
     
     def _initialize_sentiment_model(self):
         """Inicializa o modelo de análise de sentimento"""
@@ -75,73 +236,569 @@ class MarketSentimentAnalyzer:
         try:
             self.sentiment_pipeline = pipeline(
                 "sentiment-analysis",
-                model="distilbert-base-uncased-finetuned-sst-2-english",
+                model=self.model_name,
                 device=-1  # CPU (mude para 0 se tiver GPU)
             )
+            self.inference_backend = TorchBackend(
+                self.sentiment_pipeline.model,
+                self.sentiment_pipeline.tokenizer
+            )
             print("✅ Modelo carregado com sucesso!")
         except Exception as e:
             print(f"❌ Erro ao carregar modelo: {e}")
+            return
+        
+        if self.backend_name == 'onnx':
+            self._initialize_onnx_backend()
+        
+        if self.quantize == 'int8':
+            self._initialize_quantized_backend()
     
-    def fetch_news(self, keywords, days=1):
-        """Busca notícias via NEWS API"""
-        print(f"📰 Buscando notícias sobre: {keywords}")
+    def _initialize_onnx_backend(self):
+        """Ativa o backend ONNX Runtime se a paridade com o PyTorch for aceitável"""
+        print("⚙️  Preparando backend ONNX Runtime...")
+        try:
+            onnx_backend = OnnxBackend(
+                self.sentiment_pipeline.model,
+                self.sentiment_pipeline.tokenizer,
+                self.model_name,
+                cache_dir=os.getenv('ONNX_CACHE_DIR', DEFAULT_ONNX_CACHE_DIR)
+            )
+            parity = check_parity(
+                self.inference_backend, onnx_backend, self.sentiment_pipeline.tokenizer
+            )
+        except Exception as e:
+            print(f"⚠️ Backend ONNX indisponível, usando PyTorch: {e}")
+            return
+        
+        tolerance = float(os.getenv('ONNX_PARITY_TOLERANCE', 1e-3))
+        if parity['label_agreement'] < 1 or parity['max_prob_diff'] > tolerance:
+            print(f"⚠️ Paridade ONNX insuficiente ({parity}), usando PyTorch")
+            return
+        
+        self.inference_backend = onnx_backend
+        print(f"✅ Backend ONNX ativo (diferença máx.: {parity['max_prob_diff']:.2e})")
+    
+    def _initialize_quantized_backend(self):
+        """Ativa o modelo INT8 se a concordância com o fp32 atingir o mínimo configurado"""
+        if self.inference_backend.name != 'torch':
+            print(f"⚠️ Quantização ignorada: backend {self.inference_backend.name} ativo")
+            return
+        
+        print("⚙️  Quantizando modelo (INT8 dinâmico)...")
+        try:
+            quantized_backend = QuantizedTorchBackend(
+                self.sentiment_pipeline.model,
+                self.sentiment_pipeline.tokenizer
+            )
+            parity = check_parity(
+                self.inference_backend, quantized_backend, self.sentiment_pipeline.tokenizer
+            )
+        except Exception as e:
+            print(f"⚠️ Quantização indisponível, usando fp32: {e}")
+            return
+        
+        min_agreement = float(os.getenv('QUANTIZATION_MIN_AGREEMENT', 0.95))
+        if parity['label_agreement'] < min_agreement:
+            print(
+                f"⚠️ Concordância INT8 de {parity['label_agreement']:.1%} abaixo do "
+                f"mínimo de {min_agreement:.1%}, usando fp32"
+            )
+            return
+        
+        # Substituir o modelo do pipeline libera os pesos fp32 da memória
+        self.sentiment_pipeline.model = quantized_backend.model
+        self.inference_backend = quantized_backend
+        self.model_variant = 'int8'
+        print(f"✅ Modelo INT8 ativo (concordância: {parity['label_agreement']:.1%})")
+    
+    def _initialize_sentiment_store(self):
+        """Abre o cache persistente de resultados (SENTIMENT_DB_PATH vazio desativa)"""
+        db_path = os.getenv('SENTIMENT_DB_PATH', DEFAULT_DB_PATH)
+        if not db_path:
+            return
+        try:
+            self.sentiment_store = SentimentStore(
+                db_path,
+                ttl_hours=float(os.getenv('SENTIMENT_CACHE_TTL_HOURS', 72))
+            )
+            print(f"💾 Cache persistente de sentimento: {db_path}")
+        except Exception as e:
+            print(f"⚠️ Cache persistente indisponível: {e}")
+    
+    def _initialize_sentiment_history(self):
+        """Abre o histórico de artigos analisados (SENTIMENT_HISTORY_PATH vazio desativa)"""
+        history_path = os.getenv('SENTIMENT_HISTORY_PATH', DEFAULT_HISTORY_PATH)
+        if not history_path:
+            return
+        try:
+            self.sentiment_history = SentimentHistory(history_path)
+            print(f"🗄️  Histórico de sentimento: {history_path}")
+        except Exception as e:
+            print(f"⚠️ Histórico de sentimento indisponível: {e}")
+    
+    def _create_http_session(self):
+        """Cria a sessão HTTP compartilhada pelas buscas na NEWS API"""
+        session = requests.Session()
+        self.http_adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.http_pool_size,
+            pool_block=True
+        )
+        session.mount('https://', self.http_adapter)
+        session.mount('http://', self.http_adapter)
+        session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            'User-Agent': 'market-appetite/1.0'
+        })
+        return session
+    
+    def get_http_stats(self):
+        """Métricas de reutilização de conexões do pool HTTP"""
+        new_connections = 0
+        pools = self.http_adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                new_connections += pool.num_connections
         
-        from_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-        to_date = datetime.now().strftime('%Y-%m-%d')
-        
-        params = {
-            'q': keywords,
-            'from': from_date,
-            'to': to_date,
-            'sortBy': 'relevancy',
-            'pageSize': 100,
-            'apiKey': self.api_key,
-            'language': 'en'
+        http_stats = self.newsapi.http_stats
+        requests_made = http_stats['requests']
+        reused = max(requests_made - new_connections, 0)
+        return {
+            'pool_size': self.http_pool_size,
+            'requests': requests_made,
+            'new_connections': new_connections,
+            'reused_connections': reused,
+            'reuse_ratio': round(reused / requests_made, 3) if requests_made > 0 else 0,
+            'gzip_responses': http_stats['gzip_responses'],
+            'payload_bytes': http_stats['payload_bytes'],
+            'decoded_bytes': http_stats['decoded_bytes']
         }
+    
+    def fetch_news(self, keywords, days=1, since=None, status=None):
+        """Busca notícias nas fontes configuradas (NEWS API por padrão)
+        
+        Itera as páginas de resultados (listas de artigos) assim que chegam.
+        Com `since` (publishedAt ISO 8601), busca apenas artigos publicados a
+        partir desse instante; `status` é repassado à fonte (ver
+        NewsSource.iter_pages).
+        """
+        print(f"📰 Buscando notícias sobre: {keywords}")
+        count = 0
         
         try:
-            response = requests.get(self.base_url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            articles = data.get('articles', [])
-            print(f"   → Encontradas {len(articles)} notícias")
+            for page in self.news_source.iter_pages(keywords, days=days, since=since, status=status):
+                count += len(page)
+                yield page
+        except Exception as e:
+            print(f"❌ Erro ao buscar notícias de {keywords}: {e}")
+        
+        print(f"   → Encontradas {count} notícias ({keywords})")
+    
+    def stream_news(self, queries, days=1, since=None, incomplete=None):
+        """Busca várias consultas em paralelo, repassando cada página ao chegar
+        
+        As consultas são distribuídas em um pool de `self.fetch_workers`
+        threads; cada página de resultados é entregue como (consulta, artigos)
+        assim que chega, para que a análise comece antes do fim das buscas.
+        A latência de cada consulta fica registrada em `self.fetch_stats`.
+        `since` opcional mapeia consulta -> publishedAt mínimo; `incomplete`
+        opcional (set) recebe as consultas interrompidas antes do fim dos
+        resultados (limite de páginas, cota ou erro).
+        """
+        queries = list(dict.fromkeys(queries))
+        since = since or {}
+        pages = queue.Queue(maxsize=self.fetch_workers * 4)
+        
+        def fetch(query):
+            started = time.perf_counter()
+            count = 0
+            status = {}
+            try:
+                for page in self.fetch_news(query, days=days, since=since.get(query), status=status):
+                    count += len(page)
+                    pages.put((query, page))
+            finally:
+                with self._fetch_stats_lock:
+                    if not status.get('complete'):
+                        self.fetch_stats['truncated'] += 1
+                    self.fetch_stats['latencies'][query] = round(time.perf_counter() - started, 3)
+                if not status.get('complete') and incomplete is not None:
+                    incomplete.add(query)
+                # Consulta barrada pela cota (ou com erro) antes da primeira
+                # página não conta como buscada: mantém a prioridade
+                if count or status.get('complete'):
+                    self.quota.record_results(query, count)
+                pages.put((query, None))
+        
+        started = time.perf_counter()
+        # Requisições HTTP de fato feitas (uma por página da NEWS API)
+        requests_before = self.newsapi.http_stats['requests']
+        executor = ThreadPoolExecutor(max_workers=self.fetch_workers)
+        for query in queries:
+            executor.submit(fetch, query)
+        
+        remaining = len(queries)
+        try:
+            while remaining:
+                query, page = pages.get()
+                if page is None:
+                    remaining -= 1
+                    continue
+                with self._fetch_stats_lock:
+                    self.fetch_stats['pages'] += 1
+                yield query, page
+        finally:
+            # Se o consumidor parar antes, esvaziar a fila libera as threads
+            while remaining:
+                if pages.get()[1] is None:
+                    remaining -= 1
+            executor.shutdown(wait=True)
+            with self._fetch_stats_lock:
+                self.fetch_stats['requests'] += self.newsapi.http_stats['requests'] - requests_before
+                self.fetch_stats['seconds'] += time.perf_counter() - started
+    
+    def _pack_query(self, keywords):
+        """Combina palavras-chave em uma única consulta OR da NEWS API"""
+        if len(keywords) == 1:
+            return keywords[0]
+        return ' OR '.join(f'"{keyword}"' for keyword in keywords)
+    
+    def plan_queries(self, keywords):
+        """Agrupa palavras-chave em consultas OR de até `self.query_max_length` caracteres"""
+        packs = []
+        current = []
+        for keyword in dict.fromkeys(keywords):
+            candidate = current + [keyword]
+            if current and len(self._pack_query(candidate)) > self.query_max_length:
+                packs.append(current)
+                current = [keyword]
+            else:
+                current = candidate
+        if current:
+            packs.append(current)
+        return packs
+    
+    def plan_cycle(self):
+        """Planeja as consultas do ciclo
+        
+        Com o empacotamento de consultas ativo, as palavras-chave de cada
+        categoria são combinadas em consultas OR (uma requisição por pacote);
+        os artigos retornados contam para a categoria do pacote, e as marcas
+        d'água de todas as palavras-chave do pacote avançam juntas. Retorna
+        as consultas selecionadas dentro da cota, o
+        publishedAt mínimo de cada uma e, por consulta, os pares
+        (categoria, pacote de palavras-chave).
+        """
+        plans = {
+            category: (
+                self.plan_queries(keywords) if self.query_packing
+                else [[keyword] for keyword in dict.fromkeys(keywords)]
+            )
+            for category, keywords in self.asset_categories.items()
+        }
+        
+        # Cada consulta parte da marca d'água mais antiga entre suas palavras-chave
+        packs_by_query = {}
+        marks_by_query = {}
+        for category, packs in plans.items():
+            for pack in packs:
+                query = self._pack_query(pack)
+                packs_by_query.setdefault(query, []).append((category, pack))
+                marks_by_query.setdefault(query, []).extend(
+                    self.watermarks.get(category, {}).get(keyword) for keyword in pack
+                )
+        # Nunca antes do início da janela de análise: artigos mais antigos
+        # seriam descartados (e ficariam fora do histórico do plano da API)
+        window_start = (
+            datetime.now(timezone.utc) - timedelta(hours=self.window_hours)
+        ).strftime('%Y-%m-%dT%H:%M:%SZ')
+        since = {
+            query: max(min(marks, key=_utc_iso), window_start, key=_utc_iso)
+            for query, marks in marks_by_query.items() if all(marks)
+        }
+        
+        # Orçamento do ciclo: consultas de maior velocidade primeiro
+        queries = list(packs_by_query)
+        selected = self.quota.select(queries) if self.news_source.metered else queries
+        if len(selected) < len(queries):
+            print(f"⏳ Cota: {len(selected)} de {len(queries)} consultas neste ciclo")
+        
+        keywords = sum(len(keywords) for keywords in self.asset_categories.values())
+        with self._fetch_stats_lock:
+            self.fetch_stats['keywords'] += keywords
+            self.fetch_stats['calls_saved'] += keywords - len(queries)
+            self.fetch_stats['deferred'] += len(queries) - len(selected)
+        return {'queries': selected, 'since': since, 'packs': packs_by_query}
+    
+    def _reset_fetch_stats(self):
+        """Zera as métricas de busca do ciclo atual"""
+        stats = {
+            'keywords': 0,
+            'calls_saved': 0,
+            'deferred': 0,
+            'requests': 0,
+            'pages': 0,
+            'truncated': 0,
+            'seconds': 0.0,
+            'latencies': {}
+        }
+        with self._fetch_stats_lock:
+            self.fetch_stats = stats
+    
+    def get_fetch_stats(self):
+        """Resumo das métricas de busca do ciclo (latência por palavra-chave)"""
+        with self._fetch_stats_lock:
+            stats = dict(self.fetch_stats, latencies=dict(self.fetch_stats['latencies']))
+        latencies = sorted(stats['latencies'].values())
+        slowest = sorted(stats['latencies'].items(), key=lambda x: x[1], reverse=True)
+        return {
+            'keywords': stats['keywords'],
+            'requests': stats['requests'],
+            'calls_saved': stats['calls_saved'],
+            'deferred': stats['deferred'],
+            'pages': stats['pages'],
+            'truncated': stats['truncated'],
+            'workers': self.fetch_workers,
+            'wall_seconds': round(stats['seconds'], 3),
+            'latency_p50': latencies[len(latencies) // 2] if latencies else 0,
+            'latency_max': latencies[-1] if latencies else 0,
+            'slowest': dict(slowest[:5]),
+            'latencies': stats['latencies'],
+            'http': self.get_http_stats(),
+            'quota': self.quota.status()
+        }
+    
+    def _map_label(self, result):
+        """Mapeia a saída do modelo (POSITIVE/NEGATIVE) para escala -1 a 1"""
+        return {
+            'POSITIVE': (1, result['score']),
+            'NEGATIVE': (-1, result['score'])
+        }.get(result['label'], (0, 0.5))
+    
+    def _reset_inference_stats(self):
+        """Zera as métricas de inferência do ciclo atual"""
+        self.inference_stats = {
+            'texts': 0,
+            'batches': 0,
+            'tokens': 0,
+            'padded_tokens': 0,
+            'seconds': 0.0
+        }
+    
+    def get_inference_stats(self):
+        """Resumo das métricas de inferência do ciclo (padding e throughput)"""
+        stats = self.inference_stats
+        return {
+            'texts': stats['texts'],
+            'batches': stats['batches'],
+            'tokens': stats['tokens'],
+            'padding_ratio': round(
+                1 - stats['tokens'] / stats['padded_tokens'], 3
+            ) if stats['padded_tokens'] > 0 else 0,
+            'tokens_per_sec': round(
+                stats['tokens'] / stats['seconds'], 1
+            ) if stats['seconds'] > 0 else 0
+        }
+    
+    def _plan_batches(self, lengths, batch_size):
+        """Agrupa índices por comprimento em lotes limitados por orçamento de tokens
+        
+        Os textos são ordenados pelo número de tokens e cada lote cresce enquanto
+        (itens x maior comprimento do lote) couber em `self.token_budget`, sem
+        passar de `batch_size` itens. Assim textos curtos não são preenchidos
+        até o comprimento dos longos.
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+        batches = []
+        current = []
+        
+        for i in order:
+            # Ordem crescente: o item atual é sempre o mais longo do lote
+            fits = (len(current) + 1) * lengths[i] <= self.token_budget
+            if current and (not fits or len(current) >= batch_size):
+                batches.append(current)
+                current = []
+            current.append(i)
+        
+        if current:
+            batches.append(current)
+        
+        return batches
+    
+    def _encode(self, texts, max_length=512):
+        """Tokeniza textos com truncamento em tokens, reutilizando o cache
+        
+        Retorna os input_ids de cada texto (já com tokens especiais). Textos
+        vistos antes (mesmo conteúdo) não são tokenizados novamente.
+        """
+        keys = [f"{max_length}:{content_hash(text)}" for text in texts]
+        encoded = [self.token_cache.get(key) for key in keys]
+        
+        missing = [i for i, ids in enumerate(encoded) if ids is None]
+        if missing:
+            tokenizer = self.sentiment_pipeline.tokenizer
+            new_ids = tokenizer(
+                [texts[i] for i in missing],
+                truncation=True,
+                max_length=max_length
+            )['input_ids']
+            for i, ids in zip(missing, new_ids):
+                encoded[i] = tuple(ids)
+                self.token_cache.put(keys[i], encoded[i])
+        
+        return encoded
+    
+    def _run_model(self, batch_ids):
+        """Executa o backend de inferência sobre um lote de input_ids já tokenizados"""
+        return self.inference_backend.predict(batch_ids)
+    
+    def analyze_sentiment_batch(self, texts, max_length=512, batch_size=None):
+        """Analisa sentimento de vários textos em lotes
+        
+        Retorna uma lista alinhada com `texts`: cada posição contém a tupla
+        (sentimento, confiança), ou None para textos vazios. `max_length` é o
+        limite em tokens do modelo; textos maiores são truncados pelo tokenizer.
+        """
+        if not self.sentiment_pipeline:
+            return [None] * len(texts)
+        
+        batch_size = batch_size or self.batch_size
+        results = [None] * len(texts)
+        
+        # Apenas textos não vazios vão para o modelo
+        indices = [i for i, text in enumerate(texts) if text]
+        if not indices:
+            return results
+        
+        # input_ids truncados de cada texto para formar lotes homogêneos
+        encoded = self._encode([texts[i] for i in indices], max_length=max_length)
+        lengths = [len(ids) for ids in encoded]
+        
+        for batch in self._plan_batches(lengths, batch_size):
+            started = time.perf_counter()
+            try:
+                outputs = self._run_model([encoded[j] for j in batch])
+                for j, result in zip(batch, outputs):
+                    results[indices[j]] = self._map_label(result)
+            except Exception as e:
+                print(f"❌ Erro na análise em lote: {e}")
+                for j in batch:
+                    results[indices[j]] = (0, 0.5)
             
-            return articles
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Erro ao buscar notícias: {e}")
-            return []
+            # Métricas do ciclo: tokens reais vs. tokens após padding
+            batch_lengths = [lengths[j] for j in batch]
+            self.inference_stats['texts'] += len(batch)
+            self.inference_stats['batches'] += 1
+            self.inference_stats['tokens'] += sum(batch_lengths)
+            self.inference_stats['padded_tokens'] += len(batch) * max(batch_lengths)
+            self.inference_stats['seconds'] += time.perf_counter() - started
+        
+        return results
     
     def analyze_sentiment(self, text, max_length=512):
         """Analisa sentimento de um texto"""
-        if not self.sentiment_pipeline or not text:
-            return None
+        return self.analyze_sentiment_batch([text], max_length=max_length)[0]
+    
+    @property
+    def model_id(self):
+        """Identificador do modelo usado nas chaves de cache de resultados"""
+        if self.model_variant:
+            return f"{self.model_name}:{self.model_variant}"
+        return self.model_name
+    
+    def _text_hash(self, text):
+        """Hash do texto normalizado (espaços colapsados, minúsculas)"""
+        normalized = ' '.join(text.split()).lower()
+        return content_hash(normalized)
+    
+    def _label_of(self, result):
+        """Rótulo do modelo correspondente a uma tupla (sentimento, confiança)"""
+        return 'POSITIVE' if result[0] > 0 else 'NEGATIVE'
+    
+    def score_texts(self, texts):
+        """Analisa textos consultando os caches de resultados antes do modelo
         
-        try:
-            # Limitar tamanho do texto
-            text = text[:max_length]
-            
-            result = self.sentiment_pipeline(text)[0]
-            label = result['label']
-            score = result['score']
+        Ordem de consulta: cache LRU em memória, depois o armazenamento
+        persistente (uma leitura em lote) e, só para o que faltar, a inferência
+        em lote. O retorno é alinhado com `texts`, como em analyze_sentiment_batch.
+        """
+        model_id = self.model_id
+        hashes = [self._text_hash(text) if text else None for text in texts]
+        results = [
+            self.sentiment_cache.get((model_id, h)) if h else None for h in hashes
+        ]
+        
+        missing = [i for i, result in enumerate(results) if result is None and hashes[i]]
+        
+        # Cache persistente: uma consulta para todos os ausentes da memória
+        if missing and self.sentiment_store:
+            try:
+                stored = self.sentiment_store.get_many([hashes[i] for i in missing], model_id)
+            except Exception as e:
+                print(f"⚠️ Erro ao ler cache persistente: {e}")
+                stored = {}
+            for i in missing:
+                if hashes[i] in stored:
+                    label, score = stored[hashes[i]]
+                    results[i] = self._map_label({'label': label, 'score': score})
+                    self.sentiment_cache.put((model_id, hashes[i]), results[i])
+            missing = [i for i in missing if results[i] is None]
+        
+        if missing:
+            # Textos repetidos na mesma chamada passam uma única vez pelo modelo
+            first_index = {}
+            for i in missing:
+                first_index.setdefault(hashes[i], i)
+            unique = list(first_index.values())
             
-            # Mapear POSITIVE/NEGATIVE para escala -1 a 1
-            sentiment = {
-                'POSITIVE': (1, score),
-                'NEGATIVE': (-1, score)
-            }.get(label, (0, 0.5))
+            scored = dict(zip(
+                unique,
+                self.analyze_sentiment_batch([texts[i] for i in unique])
+            ))
+            new_rows = []
+            for i in unique:
+                result = scored[i]
+                # (0, 0.5) indica falha na análise; não é armazenado
+                if result and result[0] != 0:
+                    self.sentiment_cache.put((model_id, hashes[i]), result)
+                    new_rows.append((hashes[i], self._label_of(result), result[1]))
+            for i in missing:
+                results[i] = scored[first_index[hashes[i]]]
             
-            return sentiment
-        except Exception as e:
-            print(f"❌ Erro na análise: {e}")
-            return (0, 0.5)
+            # Escrita em lote no cache persistente
+            if new_rows and self.sentiment_store:
+                try:
+                    self.sentiment_store.put_many(new_rows, model_id)
+                except Exception as e:
+                    print(f"⚠️ Erro ao gravar cache persistente: {e}")
+        
+        return results
     
-    def process_articles(self, articles, category):
-        """Processa artigos e analisa sentimentos"""
-        sentiments = []
+    def get_cache_stats(self):
+        """Métricas dos caches de resultados (memória e disco) e de tokenização"""
+        stats = {
+            'sentiment': self.sentiment_cache.stats(),
+            'tokens': self.token_cache.stats()
+        }
+        if self.sentiment_store:
+            stats['persistent'] = self.sentiment_store.stats()
+        return stats
+    
+    def process_articles(self, articles, category=None):
+        """Processa artigos e analisa sentimentos
+        
+        Retorna uma lista alinhada com `articles`: o registro de sentimento de
+        cada artigo, ou None quando não foi possível analisá-lo.
+        """
+        sentiments = [None] * len(articles)
         processed_count = 0
         
-        for article in articles:
+        # Preparar textos de todos os artigos (título + descrição)
+        prepared = []
+        for i, article in enumerate(articles):
             try:
                 title = article.get('title', '')
                 description = article.get('description', '')
@@ -150,163 +807,479 @@ class MarketSentimentAnalyzer:
                 
                 # Combinar título e descrição
                 text = f"{title} {description}"
-                
-                # Analisar sentimento
-                sentiment_result = self.analyze_sentiment(text)
-                
-                if sentiment_result:
-                    sentiment_value, confidence = sentiment_result
-                    
-                    sentiment_data = {
-                        'title': title,
-                        'url': url,
-                        'source': source,
-                        'sentiment': sentiment_value,
-                        'confidence': confidence,
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    
-                    sentiments.append(sentiment_data)
-                    processed_count += 1
-                    
-                    # Mostrar progresso
-                    if processed_count % 10 == 0:
-                        print(f"   → Processados {processed_count} artigos...")
-            
+                prepared.append((i, title, url, source, text))
             except Exception as e:
                 print(f"   ⚠️ Erro ao processar artigo: {e}")
                 continue
         
+        # Analisar sentimento de todos os artigos em lotes (com cache)
+        sentiment_results = self.score_texts([p[4] for p in prepared])
+        
+        for (i, title, url, source, _), sentiment_result in zip(prepared, sentiment_results):
+            if sentiment_result:
+                sentiment_value, confidence = sentiment_result
+                
+                sentiment_data = {
+                    'title': title,
+                    'url': url,
+                    'source': source,
+                    'sentiment': sentiment_value,
+                    'confidence': confidence,
+                    'timestamp': datetime.now().isoformat()
+                }
+                
+                sentiments[i] = sentiment_data
+                processed_count += 1
+                
+                # Mostrar progresso
+                if processed_count % 10 == 0:
+                    print(f"   → Processados {processed_count} artigos...")
+        
         return sentiments
     
+    def _index_page(self, page, category, pack, cycle):
+        """Inclui uma página de resultados no índice global do ciclo
+        
+        O índice mapeia URL normalizada -> artigo e guarda todas as categorias
+        em que o artigo foi encontrado, para que cada artigo único seja
+        analisado uma única vez. Retorna as chaves dos artigos novos (fora da
+        janela e dentro do período), que seguem para a análise.
+        """
+        index = cycle['index']
+        keys = cycle['category_keys'].setdefault(category, {})
+        new_keys = []
+        
+        for article in page:
+            key = normalize_url(article.get('url') or '')
+            if not key:
+                continue
+            entry = index.get(key)
+            if entry is None:
+                entry = index[key] = {'article': article, 'categories': []}
+                published_at = _utc_iso(article.get('publishedAt') or cycle['cutoff'])
+                if key not in self.articles and published_at >= cycle['cutoff']:
+                    new_keys.append(key)
+            if category not in entry['categories']:
+                entry['categories'].append(category)
+            keys[key] = True
+        
+        # Intervalo de publicação retornado (mais antigo, mais recente), por
+        # palavra-chave do pacote; define a nova marca d'água no fim do ciclo
+        published = [a.get('publishedAt') for a in page if a.get('publishedAt')]
+        if published:
+            oldest, newest = min(published), max(published)
+            marks = self._pending_watermarks.setdefault(category, {})
+            for keyword in pack:
+                low, high = marks.get(keyword, (oldest, newest))
+                marks[keyword] = (min(low, oldest), max(high, newest))
+        return new_keys
+    
+    def reset_state(self):
+        """Descarta marcas d'água, janela de artigos e agregados incrementais"""
+        self.watermarks = {}
+        # Janela de artigos analisados, em colunas
+        self.articles = ArticleStore()
+        # Agregados por categoria: contagens [negativo, neutro, positivo] e
+        # soma das confianças, uma linha por categoria
+        self.category_counts = np.zeros((len(self.category_ids), 3), dtype=np.int64)
+        self.category_confidence = np.zeros(len(self.category_ids), dtype=np.float64)
+        # Rankings de ativos atualizados a cada artigo que entra ou sai da janela
+        self.leaderboard = AssetLeaderboard(self.asset_matcher.assets)
+        # Artigos novos (ou com categorias novas) ainda não gravados no histórico
+        self._history_keys = set()
+    
+    def _load_state(self):
+        """Carrega marcas d'água e a janela de artigos analisados do disco"""
+        self.reset_state()
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Estado incremental ignorado ({e}); reconstruindo a janela")
+            return
+        
+        self.watermarks = state.get('watermarks', {})
+        self.quota.load(state.get('quota', {}))
+        
+        columns = state.get('articles', {})
+        saved_categories = columns.get('categories', [])
+        items = []
+        for i, key in enumerate(columns.get('keys', [])):
+            mask = columns['category_mask'][i]
+            record = {
+                'title': columns['titles'][i],
+                'url': columns['urls'][i],
+                'source': columns['sources'][i],
+                'sentiment': columns['sentiment'][i],
+                'confidence': columns['confidence'][i],
+                'timestamp': datetime.fromtimestamp(columns['scored_at'][i]).isoformat()
+            }
+            categories = [
+                category for bit, category in enumerate(saved_categories) if mask >> bit & 1
+            ]
+            published_at = datetime.fromtimestamp(columns['published'][i], timezone.utc).isoformat()
+            items.append((key, record, categories, published_at))
+        self._add_articles(items)
+        print(f"💾 Estado incremental carregado: {len(self.articles)} artigos na janela")
+    
+    def save_state(self):
+        """Persiste marcas d'água e a janela de artigos analisados"""
+        if not self.state_file:
+            return
+        
+        state = {
+            'watermarks': self.watermarks,
+            'quota': self.quota.to_dict(),
+            # Colunas da janela; a máscara de categorias segue a ordem de 'categories'
+            'articles': dict(self.articles.to_dict(), categories=list(self.category_ids))
+        }
+        tmp_file = f"{self.state_file}.tmp"
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            print(f"❌ Erro ao salvar estado incremental: {e}")
+    
+    def write_history(self):
+        """Grava em lote no histórico os artigos novos ou com categorias novas do ciclo"""
+        keys, self._history_keys = self._history_keys, set()
+        if not self.sentiment_history or not keys:
+            return 0
+        
+        store = self.articles
+        categories = list(self.category_ids)
+        articles = []
+        with store.lock:
+            for key in keys:
+                row = store.row_of(key)
+                if row is None:
+                    continue  # Saiu da janela no mesmo ciclo
+                record = store.record(row)
+                articles.append({
+                    'article_key': key,
+                    'title': record['title'],
+                    'url': record['url'],
+                    'source': record['source'],
+                    'sentiment': record['sentiment'],
+                    'confidence': record['confidence'],
+                    'published_at': float(store.published[row]),
+                    'scored_at': float(store.scored_at[row]),
+                    'assets': [self.asset_matcher.assets[a] for a in store.assets_of(row)],
+                    'categories': [categories[c] for c in store.categories_of(row)]
+                })
+        
+        try:
+            return self.sentiment_history.add_articles(articles)
+        except Exception as e:
+            print(f"❌ Erro ao gravar histórico de sentimento: {e}")
+            return 0
+    
+    def _update_totals(self, rows, sign, masks=None):
+        """Soma (sign=1) ou subtrai (sign=-1) linhas do armazém dos agregados das categorias
+        
+        `masks` opcional restringe a atualização a parte das categorias de cada linha.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return
+        codes = self.articles.sentiment[rows].astype(np.int64) + 1
+        confidences = self.articles.confidence[rows]
+        if masks is None:
+            masks = self.articles.category_mask[rows]
+        
+        for category_id in range(len(self.category_ids)):
+            selected = ((masks >> np.uint64(category_id)) & np.uint64(1)).astype(bool)
+            if selected.any():
+                self.category_counts[category_id] += sign * np.bincount(codes[selected], minlength=3)
+                self.category_confidence[category_id] += sign * confidences[selected].sum()
+    
+    def _add_articles(self, items):
+        """Inclui artigos analisados na janela e nos agregados das categorias
+        
+        `items`: (chave, registro, categorias, publishedAt) de cada artigo.
+        """
+        rows = []
+        for key, record, categories, published_at in items:
+            # Ativos do título identificados uma única vez, na entrada da janela
+            asset_ids = sorted(self.asset_matcher.find_ids(record['title']))
+            self.leaderboard.add(asset_ids, int(np.sign(record['sentiment'])))
+            self._history_keys.add(key)
+            rows.append(self.articles.append(
+                key,
+                record['title'],
+                record['url'],
+                record['source'],
+                record['sentiment'],
+                record['confidence'],
+                _epoch(published_at),
+                datetime.fromisoformat(record['timestamp']).timestamp(),
+                [self.category_ids[c] for c in categories if c in self.category_ids],
+                asset_ids
+            ))
+        self._update_totals(rows, 1)
+        return rows
+    
+    def _attach_categories(self, key, categories):
+        """Atribui um artigo já analisado a novas categorias"""
+        row, added = self.articles.add_categories(
+            key, [self.category_ids[c] for c in categories if c in self.category_ids]
+        )
+        if added:
+            self._update_totals([row], 1, masks=np.array([added], dtype=np.uint64))
+            self._history_keys.add(key)
+    
+    def _evict_expired(self):
+        """Remove da janela (e dos agregados) artigos mais antigos que o período analisado"""
+        cutoff = (datetime.now(timezone.utc) - timedelta(hours=self.window_hours)).timestamp()
+        expired = self.articles.rows_published_before(cutoff)
+        self._update_totals(expired, -1)
+        for row in expired:
+            self.leaderboard.add(self.articles.assets_of(row), int(self.articles.sentiment[row]), -1)
+        self.articles.remove_rows(expired)
+        return len(expired)
+    
+    def _category_results(self):
+        """Estatísticas de todas as categorias a partir dos agregados incrementais
+        
+        Contagens, percentuais e confiança média saem de uma única operação
+        vetorizada sobre as linhas de todas as categorias; só os artigos
+        exibidos são montados como dicts, a partir das colunas da janela.
+        """
+        counts = self.category_counts
+        totals = counts.sum(axis=1)
+        divisor = np.maximum(totals, 1)
+        percentages = np.round(counts / divisor[:, None] * 100, 2)
+        avg_confidence = np.round(self.category_confidence / divisor, 3)
+        
+        results = {}
+        for category, category_id in self.category_ids.items():
+            total = int(totals[category_id])
+            negative, neutral, positive = (int(count) for count in counts[category_id])
+            if total <= 0:
+                negative_pct = neutral_pct = positive_pct = confidence = 0
+            else:
+                negative_pct, neutral_pct, positive_pct = (
+                    float(pct) for pct in percentages[category_id]
+                )
+                confidence = float(avg_confidence[category_id])
+            
+            results[category] = {
+                'positive_count': positive,
+                'positive_pct': positive_pct,
+                'negative_count': negative,
+                'negative_pct': negative_pct,
+                'neutral_count': neutral,
+                'neutral_pct': neutral_pct,
+                'total_mentions': total,
+                'avg_confidence': confidence,
+                # Top 10 artigos (os mais recentes da categoria na janela)
+                'articles': [
+                    self.articles.record(row)
+                    for row in self.articles.category_rows(category_id, limit=10)
+                ]
+            }
+        return results
+    
+    def _build_pipeline(self, plan, cycle):
+        """Estágios do ciclo: busca -> deduplicação -> análise em lotes -> agregação
+        
+        Filas limitadas entre os estágios mantêm a rede e a inferência
+        ocupadas ao mesmo tempo; um estágio lento bloqueia o anterior.
+        """
+        index = cycle['index']
+        batch = []
+        
+        def dedup(item, emit):
+            query, page = item
+            cycle['fetched'] += len(page)
+            for category, pack in plan['packs'][query]:
+                for key in self._index_page(page, category, pack, cycle):
+                    emit(key)
+        
+        def score_batch(emit):
+            records = self.process_articles([index[key]['article'] for key in batch])
+            emit(list(zip(batch, records)))
+            batch.clear()
+        
+        def score(key, emit):
+            batch.append(key)
+            if len(batch) >= self.batch_size:
+                score_batch(emit)
+        
+        def flush(emit):
+            if batch:
+                score_batch(emit)
+        
+        def aggregate(pairs, emit):
+            now = datetime.now(timezone.utc).isoformat()
+            cycle['scored'].update(pairs)
+            self._add_articles([
+                (
+                    key, record, list(index[key]['categories']),
+                    index[key]['article'].get('publishedAt') or now
+                )
+                for key, record in pairs if record
+            ])
+        
+        return Pipeline([
+            Stage('dedup', dedup),
+            Stage('score', score, flush=flush),
+            Stage('aggregate', aggregate)
+        ], queue_size=self.pipeline_queue_size)
+    
     def categorize_and_analyze(self):
-        """Categoriza ativos e analisa sentimentos por categoria"""
+        """Categoriza ativos e analisa sentimentos por categoria
+        
+        Cada ciclo busca apenas artigos novos (a partir das marcas d'água de
+        cada palavra-chave), analisa só os que ainda não estão na janela e
+        atualiza os agregados por categoria de forma incremental. As páginas
+        passam por um pipeline (busca, deduplicação, análise em lotes e
+        agregação) que sobrepõe a inferência às buscas ainda em andamento.
+        """
         print("\n📊 Iniciando análise de categorias...\n")
         
-        results = {}
+        days = max(1, int(self.window_hours // 24))
+        plan = self.plan_cycle()
+        
+        # Índice global: cada artigo único é analisado uma única vez no ciclo
+        cycle = {
+            'index': {},
+            'category_keys': {category: {} for category in self.asset_categories},
+            'scored': {},
+            'incomplete': set(),
+            'fetched': 0,
+            'cutoff': (datetime.now(timezone.utc) - timedelta(hours=self.window_hours)).isoformat()
+        }
+        self._pending_watermarks = {}
+        
+        pipeline = self._build_pipeline(plan, cycle)
+        self.pipeline_stats = pipeline.run(
+            self.stream_news(
+                plan['queries'], days=days, since=plan['since'], incomplete=cycle['incomplete']
+            ),
+            source_name='fetch'
+        )
+        
+        index = cycle['index']
+        scored = cycle['scored']
+        self.index_stats = {
+            'articles_fetched': cycle['fetched'],
+            'unique_articles': len(index),
+            'multi_category': sum(1 for e in index.values() if len(e['categories']) > 1),
+            'scoring_saved': sum(len(k) for k in cycle['category_keys'].values()) - len(index)
+        }
+        print(
+            f"🗂️  {len(index)} artigos únicos, {len(scored)} novos "
+            f"({self.index_stats['scoring_saved']} análises repetidas evitadas)"
+        )
         
-        for category, assets in self.asset_categories.items():
+        # Artigos podem ganhar categorias depois de analisados (inclusive os
+        # de ciclos anteriores), conforme as demais consultas chegam
+        for key, entry in index.items():
+            if key in self.articles:
+                self._attach_categories(key, entry['categories'])
+        
+        added = sum(1 for record in scored.values() if record)
+        evicted = self._evict_expired()
+        
+        # Marcas d'água avançam só depois que os artigos entraram na janela,
+        # até o artigo mais recente retornado. Uma consulta incremental
+        # interrompida (mais resultados que page_size x max_pages, cota ou
+        # erro) vem do mais recente ao mais antigo e só cobre sem lacunas a
+        # partir do artigo mais antigo retornado: a marca vai até ele, e não
+        # fica presa na marca anterior (que repetiria as mesmas páginas)
+        truncated = {
+            (category, keyword)
+            for query in cycle['incomplete'] if query in plan['since']
+            for category, pack in plan['packs'][query]
+            for keyword in pack
+        }
+        for category, marks in self._pending_watermarks.items():
+            for keyword, (oldest, newest) in marks.items():
+                mark = oldest if (category, keyword) in truncated else newest
+                current = self.watermarks.setdefault(category, {}).get(keyword)
+                if not current or _utc_iso(mark) > _utc_iso(current):
+                    self.watermarks[category][keyword] = mark
+        
+        self.incremental_stats = {
+            'new_articles': added,
+            'evicted_articles': evicted,
+            'window_size': len(self.articles),
+            'keywords_with_watermark': sum(len(m) for m in self.watermarks.values()),
+            'watermarks_truncated': len(truncated)
+        }
+        
+        results = self._category_results()
+        for category, data in results.items():
             print(f"🔍 Analisando categoria: {category.upper()}")
-            
-            # Buscar notícias para cada ativo da categoria
-            all_articles = []
-            for asset in assets:
-                articles = self.fetch_news(asset, days=1)
-                all_articles.extend(articles)
-            
-            # Remover duplicatas
-            unique_articles = {a['url']: a for a in all_articles}.values()
-            
-            # Processar e analisar
-            sentiments = self.process_articles(list(unique_articles), category)
-            
-            if sentiments:
-                # Calcular estatísticas
-                df = pd.DataFrame(sentiments)
-                
-                positive = len(df[df['sentiment'] > 0])
-                negative = len(df[df['sentiment'] < 0])
-                neutral = len(df[df['sentiment'] == 0])
-                total = len(df)
-                
-                results[category] = {
-                    'positive_count': int(positive),
-                    'positive_pct': round((positive / total * 100) if total > 0 else 0, 2),
-                    'negative_count': int(negative),
-                    'negative_pct': round((negative / total * 100) if total > 0 else 0, 2),
-                    'neutral_count': int(neutral),
-                    'neutral_pct': round((neutral / total * 100) if total > 0 else 0, 2),
-                    'total_mentions': total,
-                    'avg_confidence': round(df['confidence'].mean(), 3),
-                    'articles': sentiments[:10]  # Top 10 artigos
-                }
-                
-                print(f"   ✅ {category}: {positive}+ / {negative}- / {neutral}= (total: {total})\n")
-            else:
-                results[category] = {
-                    'positive_count': 0,
-                    'positive_pct': 0,
-                    'negative_count': 0,
-                    'negative_pct': 0,
-                    'neutral_count': 0,
-                    'neutral_pct': 0,
-                    'total_mentions': 0,
-                    'avg_confidence': 0,
-                    'articles': []
-                }
+            if data['total_mentions']:
+                print(
+                    f"   ✅ {category}: {data['positive_count']}+ / {data['negative_count']}- / "
+                    f"{data['neutral_count']}= (total: {data['total_mentions']})\n"
+                )
         
         return results
     
-    def identify_top_assets(self, all_data):
-        """Identifica ativos mais/menos falados e com melhor/pior sentimento"""
-        asset_stats = defaultdict(lambda: {
-            'mentions': 0,
-            'positive': 0,
-            'negative': 0,
-            'sentiment_score': 0
-        })
+    def identify_top_assets(self, k=10):
+        """Identifica ativos mais/menos falados e com melhor/pior sentimento
         
-        # Coletar dados de todos os artigos
-        for category, data in all_data.items():
-            for article in data.get('articles', []):
-                # Extrair ativos mencionados do título
-                for asset_list in self.asset_categories.values():
-                    for asset in asset_list:
-                        if asset.lower() in article['title'].lower():
-                            asset_stats[asset]['mentions'] += 1
-                            
-                            if article['sentiment'] > 0:
-                                asset_stats[asset]['positive'] += 1
-                            elif article['sentiment'] < 0:
-                                asset_stats[asset]['negative'] += 1
-                            
-                            asset_stats[asset]['sentiment_score'] += article['sentiment']
-        
-        # Converter para lista
-        assets_list = [
-            {
-                'asset': asset,
-                'mentions': stats['mentions'],
-                'positive': stats['positive'],
-                'negative': stats['negative'],
-                'sentiment_avg': round(
-                    stats['sentiment_score'] / stats['mentions'], 3
-                ) if stats['mentions'] > 0 else 0
-            }
-            for asset, stats in asset_stats.items()
-            if stats['mentions'] > 0
-        ]
+        Os rankings cobrem todos os artigos da janela e são mantidos de forma
+        incremental (heaps indexados) conforme os artigos entram e saem; aqui
+        só os k primeiros de cada um são lidos.
+        """
+        return self.leaderboard.top(k)
+    
+    def query_articles(self, category=None, asset=None, limit=50):
+        """Artigos da janela (mais recentes primeiro), filtrados por categoria ou ativo
         
-        return {
-            'most_talked': sorted(
-                assets_list,
-                key=lambda x: x['mentions'],
-                reverse=True
-            )[:10],
-            'least_talked': sorted(
-                assets_list,
-                key=lambda x: x['mentions']
-            )[:10],
-            'most_positive': sorted(
-                assets_list,
-                key=lambda x: x['sentiment_avg'],
-                reverse=True
-            )[:10],
-            'most_negative': sorted(
-                assets_list,
-                key=lambda x: x['sentiment_avg']
-            )[:10]
-        }
+        A seleção é feita nas colunas do armazém; só as linhas retornadas
+        são montadas como dicts.
+        """
+        store = self.articles
+        categories = list(self.category_ids)
+        with store.lock:
+            if category is not None:
+                if category not in self.category_ids:
+                    return []
+                rows = store.category_rows(self.category_ids[category])
+            else:
+                rows = store.newest_first(store.live_rows())
+            
+            if asset is not None:
+                asset_id = self.asset_matcher.asset_index.get(self.asset_matcher.canonical(asset))
+                if asset_id is None:
+                    return []
+                rows = rows[np.isin(rows, store.asset_rows(asset_id))]
+            
+            return [
+                dict(
+                    store.record(row),
+                    published_at=datetime.fromtimestamp(float(store.published[row]), timezone.utc).isoformat(),
+                    categories=[categories[c] for c in store.categories_of(row)],
+                    assets=[self.asset_matcher.assets[a] for a in store.assets_of(row)]
+                )
+                for row in rows[:max(limit, 0)]
+            ]
     
     def generate_report(self):
         """Gera relatório completo de análise"""
         print("🚀 Iniciando análise de sentimento do mercado...\n")
+        self._reset_inference_stats()
+        self._reset_fetch_stats()
+        self.index_stats = {}
+        self.pipeline_stats = {}
         
         # Analisar categorias
         category_results = self.categorize_and_analyze()
+        self.save_state()
+        self.history_stats = {'written': self.write_history()}
         
         # Identificar top assets
-        top_assets = self.identify_top_assets(category_results)
+        top_assets = self.identify_top_assets()
         
         # Compilar resultado final
         report = {
@@ -323,7 +1296,15 @@ class MarketSentimentAnalyzer:
                 for category, data in category_results.items()
             },
             'top_assets': top_assets,
-            'detailed_category_data': category_results
+            'detailed_category_data': category_results,
+            'performance': {
+                'fetch': self.get_fetch_stats(),
+                'index': self.index_stats,
+                'pipeline': self.pipeline_stats,
+                'incremental': self.incremental_stats,
+                'inference': self.get_inference_stats(),
+                'history': self.history_stats
+            }
         }
         
         return report
@@ -357,6 +1338,38 @@ class MarketSentimentAnalyzer:
             print(f"  ⚪ Neutro:   {sentiment['neutral']}%")
             print(f"  📰 Total de menções: {sentiment['total_mentions']}")
         
+        fetch = report.get('performance', {}).get('fetch')
+        if fetch:
+            print("\n🌐 BUSCA DE NOTÍCIAS:")
+            print("-" * 60)
+            print(f"  Requisições: {fetch['requests']} ({fetch['workers']} em paralelo)")
+            print(f"  Requisições economizadas: {fetch['calls_saved']} de {fetch['keywords']} palavras-chave")
+            print(f"  Tempo total: {fetch['wall_seconds']}s")
+            print(f"  Latência p50/máx: {fetch['latency_p50']}s / {fetch['latency_max']}s")
+            print(f"  Conexões reutilizadas: {fetch['http']['reuse_ratio']:.1%}")
+        
+        pipeline = report.get('performance', {}).get('pipeline')
+        if pipeline:
+            print("\n🔀 PIPELINE:")
+            print("-" * 60)
+            for stage in pipeline['stages']:
+                line = f"  {stage['name']}: {stage['items_out']} itens, ocupado {stage['busy_seconds']}s"
+                if 'queue' in stage:
+                    queue_stats = stage['queue']
+                    line += (
+                        f", fila máx {queue_stats['max_depth']}/{queue_stats['maxsize']}"
+                        f" (média {queue_stats['mean_depth']})"
+                    )
+                print(line)
+        
+        inference = report.get('performance', {}).get('inference')
+        if inference:
+            print("\n⚡ INFERÊNCIA:")
+            print("-" * 60)
+            print(f"  Textos: {inference['texts']} em {inference['batches']} lotes")
+            print(f"  Padding: {inference['padding_ratio']:.1%}")
+            print(f"  Tokens/s: {inference['tokens_per_sec']}")
+        
         print("\n🔥 TOP ASSETS MAIS FALADOS:")
         print("-" * 60)
         for i, asset in enumerate(report['top_assets']['most_talked'][:5], 1):
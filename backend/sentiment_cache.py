@@ -0,0 +1,223 @@
+"""
+Caches do pipeline de sentimento
+Estruturas em memória e em disco (SQLite) reutilizadas entre palavras-chave,
+ciclos de análise e reinícios do servidor
+Manutenção: python sentiment_cache.py compact
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'sentiment_cache.db'
+)
+
+
+def content_hash(text):
+    """Hash estável do conteúdo de um texto (usado como chave de cache)"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class LRUCache:
+    """Cache limitado com descarte do item menos usado recentemente (LRU)"""
+    
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def get(self, key, default=None):
+        """Retorna o valor da chave, marcando-a como usada recentemente"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+    
+    def put(self, key, value):
+        """Insere/atualiza a chave, descartando as mais antigas se exceder o limite"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Remove todas as entradas (mantém os contadores)"""
+        with self._lock:
+            self._data.clear()
+    
+    def stats(self):
+        """Tamanho e contadores de acerto/erro do cache"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups > 0 else 0
+        }
+
+
+class SentimentStore:
+    """Armazenamento persistente (SQLite) de resultados de sentimento
+    
+    Guarda (hash do texto, modelo) -> (rótulo, score) para que um reinício
+    do servidor não precise rodar o modelo novamente sobre artigos já vistos.
+    Entradas mais antigas que `ttl_hours` são ignoradas na leitura e removidas
+    por purge_expired()/compact().
+    """
+    
+    # Limite de parâmetros por consulta IN (SQLite aceita 999 em versões antigas)
+    QUERY_CHUNK = 500
+    
+    def __init__(self, path, ttl_hours=72):
+        self.path = path
+        self.ttl_seconds = ttl_hours * 3600
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sentiment_results (
+                text_hash TEXT NOT NULL,
+                model_id TEXT NOT NULL,
+                label TEXT NOT NULL,
+                score REAL NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (text_hash, model_id)
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sentiment_results_created_at
+            ON sentiment_results (created_at)
+        """)
+        self._conn.commit()
+        self.reads = 0
+        self.hits = 0
+        self.writes = 0
+    
+    def get_many(self, text_hashes, model_id):
+        """Busca em lote; retorna {text_hash: (label, score)} das entradas válidas"""
+        found = {}
+        min_created = time.time() - self.ttl_seconds
+        unique = list(dict.fromkeys(text_hashes))
+        
+        with self._lock:
+            for start in range(0, len(unique), self.QUERY_CHUNK):
+                chunk = unique[start:start + self.QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"""
+                    SELECT text_hash, label, score FROM sentiment_results
+                    WHERE model_id = ? AND created_at >= ?
+                    AND text_hash IN ({placeholders})
+                    """,
+                    [model_id, min_created, *chunk]
+                ).fetchall()
+                for text_hash, label, score in rows:
+                    found[text_hash] = (label, score)
+            
+            self.reads += len(unique)
+            self.hits += len(found)
+        
+        return found
+    
+    def put_many(self, rows, model_id):
+        """Grava em uma única transação uma lista de (text_hash, label, score)"""
+        if not rows:
+            return
+        
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO sentiment_results
+                    (text_hash, model_id, label, score, created_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [(text_hash, model_id, label, score, now)
+                     for text_hash, label, score in rows]
+                )
+            self.writes += len(rows)
+    
+    def purge_expired(self):
+        """Remove entradas expiradas; retorna quantas foram apagadas"""
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(
+                    'DELETE FROM sentiment_results WHERE created_at < ?',
+                    (time.time() - self.ttl_seconds,)
+                )
+        return cursor.rowcount
+    
+    def compact(self):
+        """Remove entradas expiradas e recupera o espaço do arquivo (VACUUM)"""
+        removed = self.purge_expired()
+        with self._lock:
+            self._conn.execute('VACUUM')
+        return removed
+    
+    def stats(self):
+        """Número de entradas e contadores de leitura/escrita"""
+        with self._lock:
+            (size,) = self._conn.execute(
+                'SELECT COUNT(*) FROM sentiment_results'
+            ).fetchone()
+        return {
+            'path': self.path,
+            'size': size,
+            'ttl_hours': round(self.ttl_seconds / 3600, 2),
+            'reads': self.reads,
+            'hits': self.hits,
+            'writes': self.writes,
+            'hit_rate': round(self.hits / self.reads, 3) if self.reads > 0 else 0
+        }
+    
+    def close(self):
+        """Fecha a conexão com o banco"""
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    """Comandos de manutenção do cache persistente"""
+    parser = argparse.ArgumentParser(description='Manutenção do cache de sentimento')
+    parser.add_argument('command', choices=['compact', 'purge', 'stats'])
+    parser.add_argument('--db', default=os.getenv('SENTIMENT_DB_PATH', DEFAULT_DB_PATH))
+    parser.add_argument('--ttl-hours', type=float,
+                        default=float(os.getenv('SENTIMENT_CACHE_TTL_HOURS', 72)))
+    args = parser.parse_args()
+    
+    store = SentimentStore(args.db, ttl_hours=args.ttl_hours)
+    try:
+        if args.command == 'compact':
+            removed = store.compact()
+            print(f"🧹 Compactação concluída: {removed} entradas expiradas removidas")
+        elif args.command == 'purge':
+            removed = store.purge_expired()
+            print(f"🧹 {removed} entradas expiradas removidas")
+        print(json.dumps(store.stats(), indent=2))
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
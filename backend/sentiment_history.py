@@ -0,0 +1,289 @@
+"""
+Histórico de sentimento dos artigos analisados
+Série temporal em SQLite gravada em lote ao fim de cada ciclo, indexada por
+ativo/categoria e data de publicação, para consultar períodos sem carregar
+tudo na memória
+Manutenção: python sentiment_history.py stats | purge --days 90
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_HISTORY_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'sentiment_history.db'
+)
+
+BUCKET_SECONDS = {'hour': 3600, 'day': 86400, 'week': 7 * 86400}
+
+
+def parse_time(value, default=None):
+    """Timestamp ISO 8601 (ou segundos desde a época) -> segundos desde a época"""
+    if value in (None, ''):
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class SentimentHistory:
+    """Série temporal (SQLite) de todos os artigos analisados
+    
+    Cada artigo é gravado uma vez; as tabelas de ativos e categorias repetem
+    data, sentimento e confiança para que as consultas por período usem só
+    o índice (ativo|categoria, data).
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                article_key TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                url TEXT,
+                source TEXT,
+                sentiment INTEGER NOT NULL,
+                confidence REAL NOT NULL,
+                published_at REAL NOT NULL,
+                scored_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_published_at
+            ON articles (published_at);
+            
+            CREATE TABLE IF NOT EXISTS article_assets (
+                asset TEXT NOT NULL,
+                published_at REAL NOT NULL,
+                article_id INTEGER NOT NULL,
+                sentiment INTEGER NOT NULL,
+                confidence REAL NOT NULL,
+                PRIMARY KEY (asset, published_at, article_id)
+            ) WITHOUT ROWID;
+            
+            CREATE TABLE IF NOT EXISTS article_categories (
+                category TEXT NOT NULL,
+                published_at REAL NOT NULL,
+                article_id INTEGER NOT NULL,
+                sentiment INTEGER NOT NULL,
+                confidence REAL NOT NULL,
+                PRIMARY KEY (category, published_at, article_id)
+            ) WITHOUT ROWID;
+        """)
+        self._conn.commit()
+        self.writes = 0
+    
+    def add_articles(self, articles):
+        """Grava em uma única transação artigos analisados
+        
+        Cada item: dict com article_key, title, url, source, sentiment,
+        confidence, published_at e scored_at (segundos desde a época), assets e
+        categories. Artigos já gravados só ganham os ativos/categorias novos.
+        """
+        if not articles:
+            return 0
+        
+        with self._lock:
+            with self._conn:
+                for article in articles:
+                    self._conn.execute(
+                        """
+                        INSERT OR IGNORE INTO articles
+                        (article_key, title, url, source, sentiment, confidence,
+                         published_at, scored_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (article['article_key'], article['title'], article['url'],
+                         article['source'], article['sentiment'], article['confidence'],
+                         article['published_at'], article['scored_at'])
+                    )
+                    # O artigo gravado prevalece (data e sentimento da primeira análise)
+                    article_id, published_at, sentiment, confidence = self._conn.execute(
+                        """
+                        SELECT id, published_at, sentiment, confidence
+                        FROM articles WHERE article_key = ?
+                        """,
+                        (article['article_key'],)
+                    ).fetchone()
+                    link = (published_at, article_id, sentiment, confidence)
+                    self._conn.executemany(
+                        """
+                        INSERT OR IGNORE INTO article_assets
+                        (asset, published_at, article_id, sentiment, confidence)
+                        VALUES (?, ?, ?, ?, ?)
+                        """,
+                        [(asset, *link) for asset in article['assets']]
+                    )
+                    self._conn.executemany(
+                        """
+                        INSERT OR IGNORE INTO article_categories
+                        (category, published_at, article_id, sentiment, confidence)
+                        VALUES (?, ?, ?, ?, ?)
+                        """,
+                        [(category, *link) for category in article['categories']]
+                    )
+            self.writes += len(articles)
+        return len(articles)
+    
+    @staticmethod
+    def _scope(asset, category):
+        """Tabela de ligação, coluna e valor do filtro (por ativo, categoria ou nenhum)"""
+        if asset is not None:
+            return 'article_assets', 'asset', asset
+        if category is not None:
+            return 'article_categories', 'category', category
+        return None, None, None
+    
+    def series(self, asset=None, category=None, start=None, end=None, bucket='day'):
+        """Sentimento agregado por intervalo (hora, dia ou semana) em um período
+        
+        Retorna uma lista ordenada de {start, mentions, positive, negative,
+        neutral, positive_pct, negative_pct, avg_sentiment, avg_confidence}.
+        """
+        seconds = BUCKET_SECONDS[bucket]
+        end = end if end is not None else time.time()
+        start = start if start is not None else end - 7 * 86400
+        table, column, value = self._scope(asset, category)
+        condition, params = (f"{column} = ? AND ", [value]) if table else ('', [])
+        
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT CAST(published_at / ? AS INTEGER) AS bucket,
+                       COUNT(*),
+                       SUM(sentiment > 0),
+                       SUM(sentiment < 0),
+                       AVG(sentiment),
+                       AVG(confidence)
+                FROM {table or 'articles'}
+                WHERE {condition}published_at >= ? AND published_at < ?
+                GROUP BY bucket
+                ORDER BY bucket
+                """,
+                [seconds, *params, start, end]
+            ).fetchall()
+        
+        return [
+            {
+                'start': _iso(bucket_id * seconds),
+                'mentions': mentions,
+                'positive': positive,
+                'negative': negative,
+                'neutral': mentions - positive - negative,
+                'positive_pct': round(positive / mentions * 100, 2),
+                'negative_pct': round(negative / mentions * 100, 2),
+                'avg_sentiment': round(avg_sentiment, 3),
+                'avg_confidence': round(avg_confidence, 3)
+            }
+            for bucket_id, mentions, positive, negative, avg_sentiment, avg_confidence in rows
+        ]
+    
+    def articles(self, asset=None, category=None, start=None, end=None, limit=100):
+        """Artigos de um período (mais recentes primeiro), até `limit`"""
+        end = end if end is not None else time.time()
+        start = start if start is not None else end - 7 * 86400
+        table, column, value = self._scope(asset, category)
+        if table:
+            # Filtra e ordena pelo índice (ativo|categoria, data) da tabela de ligação
+            join = f"JOIN {table} AS scope ON scope.article_id = a.id"
+            condition, params, published = f"scope.{column} = ? AND ", [value], 'scope.published_at'
+        else:
+            join, condition, params, published = '', '', [], 'a.published_at'
+        
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT a.title, a.url, a.source, a.sentiment, a.confidence,
+                       a.published_at, a.scored_at
+                FROM articles AS a {join}
+                WHERE {condition}{published} >= ? AND {published} < ?
+                ORDER BY {published} DESC
+                LIMIT ?
+                """,
+                [*params, start, end, max(int(limit), 1)]
+            ).fetchall()
+        
+        return [
+            {
+                'title': title,
+                'url': url,
+                'source': source,
+                'sentiment': sentiment,
+                'confidence': confidence,
+                'published_at': _iso(published_at),
+                'timestamp': _iso(scored_at)
+            }
+            for title, url, source, sentiment, confidence, published_at, scored_at in rows
+        ]
+    
+    def purge_before(self, timestamp):
+        """Remove artigos publicados antes de `timestamp`; retorna quantos"""
+        with self._lock:
+            with self._conn:
+                for table in ('article_assets', 'article_categories'):
+                    self._conn.execute(
+                        f'DELETE FROM {table} WHERE published_at < ?', (timestamp,)
+                    )
+                cursor = self._conn.execute(
+                    'DELETE FROM articles WHERE published_at < ?', (timestamp,)
+                )
+        return cursor.rowcount
+    
+    def stats(self):
+        """Número de artigos gravados e período coberto"""
+        with self._lock:
+            size, oldest, newest = self._conn.execute(
+                'SELECT COUNT(*), MIN(published_at), MAX(published_at) FROM articles'
+            ).fetchone()
+        return {
+            'path': self.path,
+            'articles': size,
+            'oldest': _iso(oldest) if oldest is not None else None,
+            'newest': _iso(newest) if newest is not None else None,
+            'writes': self.writes
+        }
+    
+    def close(self):
+        """Fecha a conexão com o banco"""
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    """Comandos de manutenção do histórico"""
+    parser = argparse.ArgumentParser(description='Manutenção do histórico de sentimento')
+    parser.add_argument('command', choices=['stats', 'purge'])
+    parser.add_argument('--db', default=os.getenv('SENTIMENT_HISTORY_PATH', DEFAULT_HISTORY_PATH))
+    parser.add_argument('--days', type=float, default=90,
+                        help='Mantém só os artigos publicados nos últimos N dias (purge)')
+    args = parser.parse_args()
+    
+    history = SentimentHistory(args.db)
+    try:
+        if args.command == 'purge':
+            cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
+            removed = history.purge_before(cutoff.timestamp())
+            print(f"🧹 {removed} artigos anteriores a {cutoff.date()} removidos")
+        print(json.dumps(history.stats(), indent=2))
+    finally:
+        history.close()
+
+
+if __name__ == '__main__':
+    main()